@@ -0,0 +1,29 @@
+"""
+Local network helpers shared by the FluidCNC server scripts.
+"""
+
+import functools
+import socket
+
+
+@functools.lru_cache(maxsize=1)
+def get_local_ip():
+    """Get the LAN IPv4 address of this machine, or None if it has none.
+
+    Resolving our own hostname needs no network traffic, so it is tried
+    first. The UDP connect() fallback only asks the kernel for a route;
+    no packet is sent.
+    """
+    try:
+        for info in socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET):
+            ip = info[4][0]
+            if not ip.startswith('127.'):
+                return ip
+    except OSError:
+        pass
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.connect(("8.8.8.8", 80))
+            return s.getsockname()[0]
+    except OSError:
+        return None
@@ -1,35 +1,30 @@
 import serial
-import time
+from grbl_io import ACK, BANNER, read_lines
 
 ser = serial.Serial('COM6', 115200, timeout=2)
-time.sleep(3)  # Wait for boot
 
-# Drain buffer
+# Wait for boot
 print("=== STARTUP ===")
-while ser.in_waiting:
-    print(ser.readline().decode('utf-8', errors='ignore').strip())
+for line in read_lines(ser, BANNER, 3):
+    print(line)
 
 # Send soft reset to get welcome message
 print("\n=== SOFT RESET ===")
 ser.write(b'\x18')  # Ctrl-X reset
-time.sleep(2)
-while ser.in_waiting:
-    print(ser.readline().decode('utf-8', errors='ignore').strip())
+for line in read_lines(ser, BANNER, 2):
+    print(line)
 
 # Status query
 print("\n=== STATUS QUERY (?) ===")
 ser.write(b'?\n')
-time.sleep(0.5)
-while ser.in_waiting:
-    print(ser.readline().decode('utf-8', errors='ignore').strip())
+for line in read_lines(ser, ACK, 0.5):
+    print(line)
 
 # Try $$ for settings
 print("\n=== SETTINGS ($$) ===")
 ser.write(b'$$\n')
-time.sleep(2)
 count = 0
-while ser.in_waiting:
-    line = ser.readline().decode('utf-8', errors='ignore').strip()
+for line in read_lines(ser, ACK, 2):
     if line:
         print(line)
         count += 1
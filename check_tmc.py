@@ -1,44 +1,39 @@
-import serial
-import serial.tools.list_ports
 import time
+from grbl_io import ACK, BANNER, SETTING, has_modem_lines, open_port, read_until, soft_reset
 
-port = list(serial.tools.list_ports.comports())[0].device
-print(f"Connecting to {port}...")
-ser = serial.Serial(port, 115200, timeout=1)
+ser = open_port()
 
 # Reset
-ser.dtr = False
-time.sleep(0.1)
-ser.dtr = True
-time.sleep(3)
-ser.reset_input_buffer()
+if has_modem_lines(ser):
+    ser.dtr = False
+    time.sleep(0.1)
+    ser.dtr = True
+    read_until(ser, BANNER, 3)
+    ser.reset_input_buffer()
+else:
+    # Through fluidcnc_daemon DTR can't reach the board
+    print("Note: connected through fluidcnc_daemon - soft reset only.")
+    print("      TMC drivers are only re-initialized by a power or DTR cycle.")
+    soft_reset(ser)
 
 # Disable homing/limits, unlock
-ser.write(b'$22=0\n')
-time.sleep(0.2)
-ser.write(b'$21=0\n')
-time.sleep(0.2)
-ser.write(b'$X\n')
-time.sleep(0.3)
-ser.reset_input_buffer()
+for cmd in (b'$22=0\n', b'$21=0\n', b'$X\n'):
+    ser.write(cmd)
+    read_until(ser, ACK, 1)
 
 # Get all settings
 ser.write(b'$$\n')
-time.sleep(2)
+data = read_until(ser, ACK, 3)
 
 print("=== MOTOR/TMC SETTINGS ===")
 all_settings = []
-while ser.in_waiting:
-    line = ser.readline().decode('utf-8', errors='ignore').strip()
-    if line.startswith('$'):
+for line in data.split(b'\n'):
+    match = SETTING.match(line)
+    if match:
         all_settings.append(line)
-        # Show settings 140-170 (motor current, microsteps, etc)
-        try:
-            num = int(line.split('=')[0][1:])
-            if 100 <= num <= 175:
-                print(line)
-        except:
-            pass
+        # Show settings 100-175 (steps, rates, motor current, microsteps, etc)
+        if 100 <= int(match.group(1)) <= 175:
+            print(line.strip().decode('utf-8', errors='ignore'))
 
 print()
 print(f"Total settings in firmware: {len(all_settings)}")
@@ -49,19 +44,16 @@ print("=== TESTING $140 RANGE ===")
 ser.reset_input_buffer()
 for val in [500, 1000, 1500, 1600, 1700, 2000]:
     ser.write(f'$140={val}\n'.encode())
-    time.sleep(0.2)
-    result = ""
-    while ser.in_waiting:
-        result += ser.readline().decode('utf-8', errors='ignore').strip()
+    reply = read_until(ser, ACK, 1).decode('utf-8', errors='ignore')
+    result = "".join(line.strip() for line in reply.splitlines())
     status = "OK" if "ok" in result else f"FAIL ({result})"
     print(f"  $140={val}: {status}")
 
 # Read current value
 ser.write(b'$140\n')
-time.sleep(0.2)
 print()
 print("Current $140 value:")
-while ser.in_waiting:
-    print("  " + ser.readline().decode('utf-8', errors='ignore').strip())
+for line in read_until(ser, ACK, 1).decode('utf-8', errors='ignore').splitlines():
+    print("  " + line.strip())
 
 ser.close()
@@ -7,12 +7,36 @@ Run: python connection_test.py
 """
 
 import serial
+import serial.threaded
 import serial.tools.list_ports
+import argparse
+import io
+import queue
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor
+from grbl_io import enable_low_latency
 
-def find_ports():
-    """Find all connected USB serial devices"""
+# Boot banners printed by the FluidCNC ESP32 firmwares
+VFD_BANNER = 'ESP32 VFD Controller'
+CHATTER_BANNER = 'Chatter Detection System'
+
+# USB vendor ID -> device type
+TYPE_BY_VID = {
+    0x0483: "grblHAL (STM32)",      # STM32 native USB
+    0x10C4: "ESP32 (CP2102)",
+    0x1A86: "ESP32 (CH340)",
+    0x303A: "ESP32-S3 (Native)",    # Espressif native USB
+    0x0403: "FTDI",
+}
+
+# (VID, PID) overrides for chips that share a vendor ID
+TYPE_BY_VIDPID = {
+    (0x1A86, 0x55D4): "ESP32 (CH9102)",
+}
+
+def find_ports(include_unknown=False):
+    """Find connected USB serial devices, skipping unknown VIDs unless asked"""
     ports = serial.tools.list_ports.comports()
     devices = []
     
@@ -20,24 +44,11 @@ def find_ports():
         vid = port.vid or 0
         pid = port.pid or 0
         
-        device_type = "Unknown"
+        device_type = TYPE_BY_VIDPID.get((vid, pid)) or TYPE_BY_VID.get(vid, "Unknown")
         baud = 115200
         
-        # STM32 (grblHAL)
-        if vid == 0x0483:
-            device_type = "grblHAL (STM32)"
-        # CP2102 (ESP32)
-        elif vid == 0x10C4:
-            device_type = "ESP32 (CP2102)"
-        # CH340 (ESP32)
-        elif vid == 0x1A86:
-            device_type = "ESP32 (CH340)"
-        # Espressif native (ESP32-S3)
-        elif vid == 0x303A:
-            device_type = "ESP32-S3 (Native)"
-        # FTDI
-        elif vid == 0x0403:
-            device_type = "FTDI"
+        if device_type == "Unknown" and not include_unknown:
+            continue
             
         devices.append({
             'port': port.device,
@@ -50,144 +61,201 @@ def find_ports():
     
     return devices
 
-def test_grblhal(port, baud=115200):
+class LineQueue(serial.threaded.LineReader):
+    """Background reader that queues every received line"""
+    TERMINATOR = b'\n'
+    
+    def __init__(self):
+        super().__init__()
+        self.lines = queue.Queue()
+    
+    def handle_line(self, line):
+        self.lines.put(line.strip())
+
+def collect(proto, done, timeout):
+    """Gather queued lines until done(line) is true or timeout expires"""
+    deadline = time.monotonic() + timeout
+    lines = []
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            line = proto.lines.get(timeout=remaining)
+        except queue.Empty:
+            break
+        lines.append(line)
+        if done(line):
+            break
+    return '\n'.join(lines)
+
+def test_grblhal(port, baud=115200, out=None):
     """Test grblHAL connection"""
-    print(f"\n{'='*50}")
-    print(f"Testing grblHAL on {port}...")
-    print('='*50)
+    print(f"\n{'='*50}", file=out)
+    print(f"Testing grblHAL on {port}...", file=out)
+    print('='*50, file=out)
     
     try:
         ser = serial.Serial(port, baud, timeout=2)
-        time.sleep(0.5)
+        enable_low_latency(ser)
         
         # Clear buffer
         ser.reset_input_buffer()
         
-        # Send soft reset
-        ser.write(b'\x18')
-        time.sleep(0.5)
-        
-        # Read welcome message
-        welcome = ser.read(ser.in_waiting or 1024).decode('utf-8', errors='ignore')
-        print(f"Welcome: {welcome[:200]}...")
-        
-        # Send status query
-        ser.write(b'?\n')
-        time.sleep(0.2)
-        status = ser.read(ser.in_waiting or 256).decode('utf-8', errors='ignore')
-        print(f"Status: {status.strip()}")
-        
-        # Check for StallGuard
-        if '|SG:' in status:
-            print("✓ StallGuard data present!")
-            sg_start = status.find('|SG:')
-            sg_end = status.find('|', sg_start + 1) if status.find('|', sg_start + 1) > 0 else status.find('>', sg_start)
-            sg_data = status[sg_start:sg_end]
-            print(f"  StallGuard: {sg_data}")
-        else:
-            print("⚠ No StallGuard data (flash updated firmware)")
-        
-        # Get version
-        ser.write(b'$I\n')
-        time.sleep(0.2)
-        version = ser.read(ser.in_waiting or 512).decode('utf-8', errors='ignore')
-        print(f"Version info:\n{version}")
+        with serial.threaded.ReaderThread(ser, LineQueue) as proto:
+            # Send soft reset
+            proto.transport.write(b'\x18')
+            
+            # Read welcome message
+            welcome = collect(proto, lambda line: line.startswith('Grbl'), 0.5)
+            print(f"Welcome: {welcome[:200]}...", file=out)
+            
+            # Send status query - a bare realtime '?', so no stray 'ok' is
+            # left queued for the $I reply below to stop on
+            proto.transport.write(b'?')
+            status = collect(proto, lambda line: line.startswith('<'), 0.5)
+            print(f"Status: {status.strip()}", file=out)
+            
+            # Check for StallGuard
+            if '|SG:' in status:
+                print("✓ StallGuard data present!", file=out)
+                sg_start = status.find('|SG:')
+                sg_end = status.find('|', sg_start + 1) if status.find('|', sg_start + 1) > 0 else status.find('>', sg_start)
+                sg_data = status[sg_start:sg_end]
+                print(f"  StallGuard: {sg_data}", file=out)
+            else:
+                print("⚠ No StallGuard data (flash updated firmware)", file=out)
+            
+            # Get version
+            proto.transport.write(b'$I\n')
+            version = collect(proto, lambda line: line == 'ok', 1)
+            print(f"Version info:\n{version}", file=out)
         
-        ser.close()
         return True
         
     except Exception as e:
-        print(f"✗ Error: {e}")
+        print(f"✗ Error: {e}", file=out)
         return False
 
-def test_vfd(port, baud=115200):
+def test_vfd(port, baud=115200, out=None):
     """Test VFD ESP32 controller"""
-    print(f"\n{'='*50}")
-    print(f"Testing VFD Controller on {port}...")
-    print('='*50)
+    print(f"\n{'='*50}", file=out)
+    print(f"Testing VFD Controller on {port}...", file=out)
+    print('='*50, file=out)
     
     try:
         ser = serial.Serial(port, baud, timeout=3)
-        time.sleep(2)  # Wait for ESP32 boot
-        
-        # Clear buffer
-        ser.reset_input_buffer()
+        enable_low_latency(ser)
         
-        # Send STATUS command
-        ser.write(b'STATUS\n')
-        time.sleep(0.5)
+        with serial.threaded.ReaderThread(ser, LineQueue) as proto:
+            # Wait for ESP32 boot; the banner is enough to rule out the chatter sensor
+            boot = collect(proto, lambda line: VFD_BANNER in line or CHATTER_BANNER in line, 2)
+            if CHATTER_BANNER in boot:
+                print("⚠ Not a VFD controller (chatter sensor banner)", file=out)
+                return False
+            
+            # Send STATUS command
+            proto.write_line('STATUS')
+            
+            # Read response
+            response = collect(proto, lambda line: '"vfd"' in line, 1)
         
-        # Read response
-        response = ser.read(ser.in_waiting or 1024).decode('utf-8', errors='ignore')
-        print(f"Response: {response[-500:]}")
+        print(f"Response: {response[-500:]}", file=out)
         
         # Check for VFD JSON
         if '"vfd"' in response:
-            print("✓ VFD Controller confirmed!")
+            print("✓ VFD Controller confirmed!", file=out)
             # Parse JSON status
             try:
                 for line in response.split('\n'):
                     if line.startswith('{') and '"vfd"' in line:
                         data = json.loads(line)
                         vfd = data.get('vfd', {})
-                        print(f"  Online: {vfd.get('online')}")
-                        print(f"  Running: {vfd.get('running')}")
-                        print(f"  Direction: {vfd.get('direction')}")
-                        print(f"  Actual RPM: {vfd.get('actualRpm')}")
-                        print(f"  Temperature: {vfd.get('vfdTempC')}°C")
+                        print(f"  Online: {vfd.get('online')}", file=out)
+                        print(f"  Running: {vfd.get('running')}", file=out)
+                        print(f"  Direction: {vfd.get('direction')}", file=out)
+                        print(f"  Actual RPM: {vfd.get('actualRpm')}", file=out)
+                        print(f"  Temperature: {vfd.get('vfdTempC')}°C", file=out)
             except json.JSONDecodeError:
                 pass
         else:
-            print("⚠ Not a VFD controller")
+            print("⚠ Not a VFD controller", file=out)
         
-        ser.close()
         return '"vfd"' in response
         
     except Exception as e:
-        print(f"✗ Error: {e}")
+        print(f"✗ Error: {e}", file=out)
         return False
 
-def test_chatter(port, baud=115200):
+def test_chatter(port, baud=115200, out=None):
     """Test Chatter sensor ESP32-S3"""
-    print(f"\n{'='*50}")
-    print(f"Testing Chatter Sensor on {port}...")
-    print('='*50)
+    print(f"\n{'='*50}", file=out)
+    print(f"Testing Chatter Sensor on {port}...", file=out)
+    print('='*50, file=out)
+    
+    def is_chatter(line):
+        return 'ChatterDetect' in line or '"audio"' in line or '"accel"' in line
     
     try:
         ser = serial.Serial(port, baud, timeout=3)
-        time.sleep(2)  # Wait for ESP32 boot
+        enable_low_latency(ser)
         
-        # Clear buffer
-        ser.reset_input_buffer()
-        
-        # Send INFO command
-        ser.write(b'INFO\n')
-        time.sleep(0.5)
+        with serial.threaded.ReaderThread(ser, LineQueue) as proto:
+            # Wait for ESP32 boot; the banner identifies the sensor without a round-trip
+            boot = collect(proto, lambda line: CHATTER_BANNER in line, 2)
+            if CHATTER_BANNER in boot:
+                print("✓ Chatter Sensor confirmed! (boot banner)", file=out)
+                return True
+            
+            # Send INFO command
+            proto.write_line('INFO')
+            
+            # Read response
+            response = collect(proto, is_chatter, 1)
         
-        # Read response
-        response = ser.read(ser.in_waiting or 1024).decode('utf-8', errors='ignore')
-        print(f"Response: {response[-500:]}")
+        print(f"Response: {response[-500:]}", file=out)
         
         # Check for Chatter signatures
-        if 'ChatterDetect' in response or '"audio"' in response or '"accel"' in response:
-            print("✓ Chatter Sensor confirmed!")
+        if is_chatter(response):
+            print("✓ Chatter Sensor confirmed!", file=out)
         else:
-            print("⚠ Not a chatter sensor")
+            print("⚠ Not a chatter sensor", file=out)
         
-        ser.close()
         return 'Chatter' in response or '"audio"' in response
         
     except Exception as e:
-        print(f"✗ Error: {e}")
+        print(f"✗ Error: {e}", file=out)
         return False
 
+def probe(device):
+    """Run the probes for one device, returning (role, captured output)"""
+    out = io.StringIO()
+    role = None
+    
+    if device['type'] == 'grblHAL (STM32)':
+        if test_grblhal(device['port'], out=out):
+            role = 'grbl'
+    
+    elif 'ESP32' in device['type']:
+        # Try VFD first, then Chatter
+        if test_vfd(device['port'], out=out):
+            role = 'vfd'
+        elif test_chatter(device['port'], out=out):
+            role = 'chatter'
+    
+    return role, out.getvalue()
+
 def main():
+    parser = argparse.ArgumentParser(description='FluidCNC Connection Tester')
+    parser.add_argument('--all', action='store_true', help='Also list ports with unknown USB VIDs')
+    args = parser.parse_args()
+    
     print("="*60)
     print("FluidCNC Connection Tester")
     print("="*60)
     
     # Find all devices
-    devices = find_ports()
+    devices = find_ports(include_unknown=args.all)
     
     if not devices:
         print("\n⚠ No USB serial devices found!")
@@ -200,20 +268,14 @@ def main():
         print(f"    VID:PID = {d['vid']:04X}:{d['pid']:04X}")
         print(f"    Description: {d['desc']}")
     
-    # Test each device
+    # Test all devices in parallel so the ESP32 boot waits overlap
     results = {'grbl': None, 'vfd': None, 'chatter': None}
     
-    for d in devices:
-        if d['type'] == 'grblHAL (STM32)':
-            if test_grblhal(d['port']):
-                results['grbl'] = d['port']
-        
-        elif 'ESP32' in d['type']:
-            # Try VFD first, then Chatter
-            if test_vfd(d['port']):
-                results['vfd'] = d['port']
-            elif test_chatter(d['port']):
-                results['chatter'] = d['port']
+    with ThreadPoolExecutor(max_workers=len(devices)) as pool:
+        for d, (role, log) in zip(devices, pool.map(probe, devices)):
+            print(log, end='')
+            if role:
+                results[role] = d['port']
     
     # Summary
     print("\n" + "="*60)
@@ -80,8 +80,11 @@ sudo -u $ACTUAL_USER python3 -m venv "$FLUIDCNC_DIR/venv"
 sudo -u $ACTUAL_USER "$FLUIDCNC_DIR/venv/bin/pip" install --upgrade pip
 sudo -u $ACTUAL_USER "$FLUIDCNC_DIR/venv/bin/pip" install \
     pyserial \
-    websockets \
-    aiohttp
+    pyserial-asyncio \
+    "websockets>=14" \
+    "aiohttp>=3.11" \
+    uvloop \
+    orjson
 
 # ============================================================
 # 4. USB Serial Permissions
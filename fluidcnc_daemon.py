@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+FluidCNC Serial Daemon
+Keeps the grblHAL port open so the maintenance scripts don't reopen it
+(and wait for the controller to come back up) on every run.
+
+Run: python fluidcnc_daemon.py [--com COM5]
+Scripts that use grbl_io.open_port(), and test_uart.py, connect through it automatically.
+Clients are served one at a time, so commands from two scripts never interleave.
+"""
+
+import argparse
+import socket
+import socketserver
+import threading
+from grbl_io import DAEMON_PORT, find_port, open_serial
+
+class Relay(socketserver.BaseRequestHandler):
+    """Pipe one client connection to the serial port until it disconnects"""
+    
+    def handle(self):
+        ser = self.server.ser
+        ser.reset_input_buffer()
+        # Replies go out in small pieces; don't let Nagle hold each one for an ACK
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        stop = threading.Event()
+        
+        def pump():
+            while not stop.is_set():
+                data = ser.read(ser.in_waiting or 1)
+                if data:
+                    try:
+                        self.request.sendall(data)
+                    except OSError:
+                        break
+        
+        reader = threading.Thread(target=pump, daemon=True)
+        reader.start()
+        try:
+            while True:
+                data = self.request.recv(4096)
+                if not data:
+                    break
+                ser.write(data)
+        except OSError:
+            pass
+        finally:
+            stop.set()
+            reader.join()
+
+def main():
+    parser = argparse.ArgumentParser(description='FluidCNC Serial Daemon')
+    parser.add_argument('--com', type=str, default=None, help='grblHAL serial port')
+    parser.add_argument('--baud', type=int, default=115200, help='Baud rate')
+    parser.add_argument('--port', type=int, default=DAEMON_PORT, help='Local TCP port')
+    args = parser.parse_args()
+    
+    com_port = args.com or find_port()
+    if not com_port:
+        print("No serial port found")
+        return
+    
+    ser = open_serial(com_port, args.baud, timeout=0.1)
+    
+    socketserver.TCPServer.allow_reuse_address = True
+    with socketserver.TCPServer(('127.0.0.1', args.port), Relay) as server:
+        server.ser = ser
+        print(f"Serving {com_port} @ {args.baud} on 127.0.0.1:{args.port}")
+        print("Press Ctrl+C to stop")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nDaemon stopped.")
+        finally:
+            ser.close()
+
+if __name__ == '__main__':
+    main()
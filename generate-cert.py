@@ -1,44 +1,27 @@
 #!/usr/bin/env python3
 """Generate a self-signed SSL certificate for local HTTPS development."""
 
-from datetime import datetime, timedelta
-import os
+from datetime import datetime, timedelta, timezone
+import ipaddress
+import sys
 
 try:
     from cryptography import x509
     from cryptography.x509.oid import NameOID
     from cryptography.hazmat.primitives import hashes, serialization
-    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.hazmat.primitives.asymmetric import ec
 except ImportError:
-    print("Installing cryptography package...")
-    os.system("pip install cryptography")
-    from cryptography import x509
-    from cryptography.x509.oid import NameOID
-    from cryptography.hazmat.primitives import hashes, serialization
-    from cryptography.hazmat.primitives.asymmetric import rsa
+    sys.exit("❌ The cryptography package is required: pip install cryptography")
 
 import socket
-
-def get_local_ip():
-    """Get the local IP address of this machine."""
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-        s.close()
-        return ip
-    except:
-        return "192.168.1.100"
+from _netutil import get_local_ip
 
 def generate_cert():
-    local_ip = get_local_ip()
+    local_ip = get_local_ip() or "192.168.1.100"
     print(f"Generating certificate for localhost and {local_ip}")
     
-    # Generate private key
-    key = rsa.generate_private_key(
-        public_exponent=65537,
-        key_size=2048,
-    )
+    # Generate private key (P-256 keygen is ~100x faster than RSA-2048)
+    key = ec.generate_private_key(ec.SECP256R1())
     
     # Certificate subject
     subject = issuer = x509.Name([
@@ -48,21 +31,22 @@ def generate_cert():
     ])
     
     # Build certificate with SAN for localhost and local IP
-    import ipaddress
+    now = datetime.now(timezone.utc)
+    hostname = socket.gethostname()
+    ips = [ipaddress.IPv4Address("127.0.0.1"), ipaddress.IPv4Address(local_ip)]
     cert = (
         x509.CertificateBuilder()
         .subject_name(subject)
         .issuer_name(issuer)
         .public_key(key.public_key())
         .serial_number(x509.random_serial_number())
-        .not_valid_before(datetime.utcnow())
-        .not_valid_after(datetime.utcnow() + timedelta(days=365))
+        .not_valid_before(now)
+        .not_valid_after(now + timedelta(days=365))
         .add_extension(
             x509.SubjectAlternativeName([
                 x509.DNSName("localhost"),
-                x509.DNSName(socket.gethostname()),
-                x509.IPAddress(ipaddress.IPv4Address("127.0.0.1")),
-                x509.IPAddress(ipaddress.IPv4Address(local_ip)),
+                x509.DNSName(hostname),
+                *(x509.IPAddress(ip) for ip in ips),
             ]),
             critical=False,
         )
@@ -0,0 +1,242 @@
+"""
+Shared serial helpers for the grblHAL maintenance scripts.
+
+Run the scripts from the repository root so `import grbl_io` resolves.
+"""
+
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+import serial
+import serial.tools.list_ports
+
+if sys.platform.startswith('linux'):
+    import array
+    import fcntl
+    import termios
+
+# Lines that terminate the response to a single grblHAL command
+ACK = (b'ok', b'error')
+# Start of the welcome message printed after boot or soft reset
+BANNER = (b'Grbl',)
+# One `$N=value` line of a `$$` dump; group 1 is the setting number
+SETTING = re.compile(rb'^\$(\d+)=')
+
+# Last port a script connected to, so the next run can skip the USB scan
+PORT_CACHE = Path.home() / '.fluidcnc_ports.json'
+# Local TCP port fluidcnc_daemon.py relays the controller on
+DAEMON_PORT = 8765
+# USB vendor ID of the STM32 native USB port grblHAL enumerates as
+STM32_VID = 0x0483
+
+# serial_struct.flags bit that makes the kernel push received bytes at once
+ASYNC_LOW_LATENCY = 1 << 13
+
+
+def read_until(ser, terminator=ACK, timeout=2.0, count=1):
+    """Read until `count` lines starting with `terminator` arrive or `timeout` expires.
+
+    Returns every byte received, including the terminating line. On timeout
+    the partial response is returned so callers can still print it.
+    """
+    if isinstance(terminator, bytes):
+        terminator = (terminator,)
+    deadline = time.monotonic() + timeout
+    buf = bytearray()
+    scanned = 0
+    found = 0
+    while time.monotonic() < deadline:
+        chunk = ser.read(ser.in_waiting or 1)
+        if not chunk:
+            continue
+        buf += chunk
+        end = buf.rfind(b'\n')
+        if end < scanned:
+            continue
+        for line in buf[scanned:end].split(b'\n'):
+            if line.strip().startswith(terminator):
+                found += 1
+                if found >= count:
+                    return bytes(buf)
+        scanned = end + 1
+    return bytes(buf)
+
+
+def iter_lines(ser, terminator=ACK, timeout=2.0):
+    """Yield raw reply lines as they arrive, up to and including the terminating line.
+
+    Lets long replies such as `$$` be processed while they stream in rather
+    than after the whole dump has been buffered.
+    """
+    if isinstance(terminator, bytes):
+        terminator = (terminator,)
+    deadline = time.monotonic() + timeout
+    buf = bytearray()
+    while time.monotonic() < deadline:
+        chunk = ser.read(ser.in_waiting or 1)
+        if not chunk:
+            continue
+        buf += chunk
+        start = 0
+        while (end := buf.find(b'\n', start)) != -1:
+            line = bytes(buf[start:end])
+            start = end + 1
+            yield line
+            if line.strip().startswith(terminator):
+                return
+        del buf[:start]
+
+
+def read_lines(ser, terminator=ACK, timeout=2.0, count=1):
+    """Like read_until(), but decoded once and split into stripped lines."""
+    data = read_until(ser, terminator, timeout, count)
+    return [line.strip() for line in data.decode('utf-8', errors='ignore').splitlines()]
+
+
+def find_port():
+    """Scan for the controller, preferring an STM32 VID over the first port."""
+    ports = serial.tools.list_ports.comports()
+    for p in ports:
+        if p.vid == STM32_VID:
+            return p.device
+    return ports[0].device if ports else None
+
+
+def open_serial(port, baud=115200, timeout=1):
+    """Open `port` without pulsing DTR/RTS.
+
+    Opening normally asserts DTR, which auto-reset circuits turn into an MCU
+    reset followed by a multi-second boot. Holding both lines low skips it.
+    """
+    ser = serial.Serial()
+    ser.port = port
+    ser.baudrate = baud
+    ser.timeout = timeout
+    ser.dtr = False
+    ser.rts = False
+    ser.open()
+    return ser
+
+
+def has_modem_lines(ser):
+    """False for socket:// connections such as fluidcnc_daemon, where DTR/RTS do nothing."""
+    return not (ser.port or '').startswith('socket://')
+
+
+def soft_reset(ser, timeout=2.0):
+    """Reset grblHAL with Ctrl-X and wait for its welcome banner."""
+    ser.write(b'\x18')
+    read_until(ser, BANNER, timeout)
+    ser.reset_input_buffer()
+
+
+def _connect(port, baud, timeout):
+    if port is None:
+        try:
+            ser = serial.serial_for_url(f'socket://127.0.0.1:{DAEMON_PORT}', timeout=timeout)
+            print(f"Connected through fluidcnc_daemon on port {DAEMON_PORT}")
+            return ser
+        except serial.SerialException:
+            pass
+        try:
+            cached = json.loads(PORT_CACHE.read_text())['port']
+            print(f"Connecting to {cached}...")
+            return open_serial(cached, baud, timeout)
+        except (OSError, ValueError, KeyError, serial.SerialException):
+            pass
+        port = find_port()
+        if not port:
+            sys.exit("No serial port found")
+    print(f"Connecting to {port}...")
+    ser = open_serial(port, baud, timeout)
+    try:
+        PORT_CACHE.write_text(json.dumps({'port': port}))
+    except OSError:
+        pass
+    return ser
+
+
+def open_port(port=None, baud=115200, timeout=1, reset=False):
+    """Open `port`, or the controller's port when none is given.
+
+    If fluidcnc_daemon.py is running, its already-open port is used. Otherwise
+    the last port that opened is kept in PORT_CACHE and tried first, since
+    enumerating ports is slow on Windows; a full scan only runs when it fails.
+    The port is opened without resetting the controller unless `reset` is set.
+    """
+    ser = _connect(port, baud, timeout)
+    if reset:
+        soft_reset(ser)
+    return ser
+
+
+def send(ser, cmd, timeout=1.0, expect=ACK, echo=False):
+    """Send one command line and return its non-empty reply lines.
+
+    Returns as soon as a line starting with `expect` arrives instead of
+    sleeping for a fixed time. With `echo` the command and reply are printed.
+    """
+    if echo:
+        print(f">> {cmd}")
+    ser.write((cmd + '\n').encode())
+    reply = [line for line in read_lines(ser, expect, timeout) if line]
+    if echo:
+        for line in reply:
+            print(f"   {line}")
+    return reply
+
+
+def send_batch(ser, cmds, timeout=2.0, echo=False):
+    """Pipeline independent commands and return one reply list per command.
+
+    All lines are written at once and the acks are matched up afterwards,
+    so N settings cost one round-trip instead of N. Keep motion commands on
+    send()/move(); keep batches well under the controller's RX buffer.
+    """
+    ser.write(''.join(cmd + '\n' for cmd in cmds).encode())
+    replies = [[]]
+    for line in read_lines(ser, ACK, timeout, count=len(cmds)):
+        if not line:
+            continue
+        replies[-1].append(line)
+        if line.startswith(('ok', 'error')):
+            replies.append([])
+    replies = replies[:len(cmds)]
+    replies += [[] for _ in range(len(cmds) - len(replies))]
+    if echo:
+        for cmd, reply in zip(cmds, replies):
+            print(f">> {cmd}")
+            for line in reply:
+                print(f"   {line}")
+    return replies
+
+
+def move(ser, cmd, timeout, echo=False):
+    """Send a motion command and block until the machine has finished it."""
+    reply = send(ser, cmd, echo=echo)
+    # A dwell is only acked once the planner buffer has drained
+    send(ser, 'G4 P0', timeout)
+    return reply
+
+
+def enable_low_latency(ser):
+    """Drop the USB-serial latency timer to 1 ms (Linux only).
+
+    FTDI and CP210x adapters otherwise hold received bytes for up to 16 ms
+    before handing them to the host, which adds to every request/reply.
+    Returns True if the driver accepted the flag.
+    """
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        # struct serial_struct is 32 ints wide at most; flags is the 5th field
+        info = array.array('i', [0] * 32)
+        fcntl.ioctl(ser.fd, termios.TIOCGSERIAL, info)
+        info[4] |= ASYNC_LOW_LATENCY
+        fcntl.ioctl(ser.fd, termios.TIOCSSERIAL, info)
+        return True
+    except (AttributeError, OSError):
+        return False
@@ -14,21 +14,23 @@ First time setup:
 """
 
 import http.server
+import shutil
 import ssl
 import os
 import sys
-import socket
+from _netutil import get_local_ip
 
-def get_local_ip():
-    """Get the local IP address of this machine."""
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-        s.close()
-        return ip
-    except:
-        return "Unknown"
+# Copy chunk for static files; sendfile() can't be used under TLS
+COPY_BUFSIZE = 64 * 1024
+
+class Handler(http.server.SimpleHTTPRequestHandler):
+    """Static file handler tuned for many small assets over TLS."""
+    
+    # Send tiny responses immediately instead of waiting on Nagle
+    disable_nagle_algorithm = True
+    
+    def copyfile(self, source, outputfile):
+        shutil.copyfileobj(source, outputfile, COPY_BUFSIZE)
 
 def main():
     port = int(sys.argv[1]) if len(sys.argv) > 1 else 8443
@@ -42,14 +44,17 @@ def main():
     
     # Create HTTPS server
     server_address = ('', port)
-    httpd = http.server.HTTPServer(server_address, http.server.SimpleHTTPRequestHandler)
+    httpd = http.server.ThreadingHTTPServer(server_address, Handler)
     
     # Wrap with SSL
     context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
     context.load_cert_chain('server.crt', 'server.key')
-    httpd.socket = context.wrap_socket(httpd.socket, server_side=True)
+    # TLS 1.3 only: 1-RTT handshakes and AES-GCM suites OpenSSL runs on AES-NI
+    context.minimum_version = ssl.TLSVersion.TLSv1_3
+    # Defer the handshake to the request thread so a slow client can't stall accept()
+    httpd.socket = context.wrap_socket(httpd.socket, server_side=True, do_handshake_on_connect=False)
     
-    local_ip = get_local_ip()
+    local_ip = get_local_ip() or "Unknown"
     
     print("=" * 60)
     print("  FluidCNC HTTPS Server")
@@ -1,32 +1,19 @@
-import serial
-import serial.tools.list_ports
-import time
+import sys
+from grbl_io import ACK, SETTING, iter_lines, open_port, read_until
 
-ports = list(serial.tools.list_ports.comports())
-if not ports:
-    print("No serial port found")
-    exit()
-
-port = ports[0].device
-print(f"Connecting to {port}...")
-ser = serial.Serial(port, 115200, timeout=1)
-time.sleep(2)
+ser = open_port(reset='--reset' in sys.argv)
 ser.reset_input_buffer()
 
 # Unlock
 ser.write(b'$X\n')
-time.sleep(0.3)
-ser.reset_input_buffer()
-
-# Query all settings
-ser.write(b'$$\n')
-time.sleep(1.5)
+read_until(ser, ACK, 1)
 
+# Query all settings, printing each one as it arrives
 print("=== GRBLHAL SETTINGS ===")
-while ser.in_waiting:
-    line = ser.readline().decode('utf-8', errors='ignore').strip()
-    if line and line.startswith('$'):
-        print(line)
+ser.write(b'$$\n')
+for line in iter_lines(ser, ACK, 3):
+    if SETTING.match(line):
+        print(line.strip().decode('utf-8', errors='ignore'))
 
 ser.close()
 print("\nDone!")
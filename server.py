@@ -8,27 +8,60 @@ Any bugs here could cause dangerous machine behavior!
 """
 import asyncio
 import argparse
+import functools
 import json
+import logging
+import logging.handlers
+import queue
 import serial
 import serial.tools.list_ports
+import serial_asyncio
 import sys
 from pathlib import Path
 from aiohttp import web
 import aiohttp
+from _netutil import get_local_ip
+
+try:
+    import uvloop  # libuv event loop - not available on Windows
+except ImportError:
+    uvloop = None
+
+try:
+    # orjson parses/serializes in C and emits UTF-8 bytes ready for broadcast()
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    json_loads = json.loads
+
+def json_line(obj):
+    """Serialize a bridge message as one '\\n'-terminated line.
+
+    grblhal.js splits frames on newlines like serial output, and client_writer
+    batches newline-terminated payloads into one frame.
+    """
+    return json_dumps(obj) + b'\n'
 
 # Python version check
-if sys.version_info < (3, 8):
-    print("ERROR: Python 3.8+ required for FluidCNC")
+if sys.version_info < (3, 9):
+    print("ERROR: Python 3.9+ required for FluidCNC")
     sys.exit(1)
 
 STATIC_DIR = Path(__file__).parent
-serial_port = None
-vfd_port = None  # ESP32 VFD controller
-connected_clients = set()
+log = logging.getLogger('fluidcnc')
+# Serial streams (asyncio StreamReader/StreamWriter pairs)
+grbl_rx = grbl_tx = None
+grbl_port = None  # Last port init_serial() opened, retried first on reconnect
+last_status = None  # Most recent '<...>' report, handed to clients as they connect
+vfd_rx = vfd_tx = None  # ESP32 VFD controller
+connected_clients = {}  # WebSocket -> outbound message queue
 
-# CRITICAL SAFETY FIX: Mutex for serial port access
-# Prevents command corruption from concurrent WebSocket messages
-serial_lock = asyncio.Lock()
+# CRITICAL SAFETY FIX: G-code lines and realtime bytes are written synchronously
+# in arrival order - StreamWriter.write() appends whole buffers, so concurrent
+# WebSocket messages can't corrupt or overtake each other
 vfd_lock = asyncio.Lock()
 
 # VFD status (updated by ESP32)
@@ -50,160 +83,214 @@ MAX_CLIENTS = 10
 # Maximum buffer size to prevent memory exhaustion
 MAX_BUFFER_SIZE = 4096
 
-# Allowed realtime characters (safety whitelist)
-ALLOWED_REALTIME = {'!', '~', '?', '\x18', '\x85', '\x90', '\x91', '\x92', '\x93', '\x94', '\x95', '\x96', '\x97', '\x98', '\x99', '\x9A', '\x9B', '\x9C', '\x9D'}
+# Messages queued per client; beyond this the oldest are discarded
+CLIENT_QUEUE_SIZE = 256
+
+# Pre-serialized bridge_status messages for the fixed states
+BRIDGE_STATUS = {state: json_line({"type": "bridge_status", "serial": state})
+                 for state in ("connected", "disconnected", "reconnecting")}
+
+# Realtime status report request - no newline, so grblHAL doesn't also answer 'ok'
+STATUS_QUERY = b'?'
+
+# Allowed realtime characters (safety whitelist), mapped to the single byte grblHAL expects
+ALLOWED_REALTIME = {chr(b): bytes((b,)) for b in b'!~?\x18\x85\x90\x91\x92\x93\x94\x95\x96\x97\x98\x99\x9A\x9B\x9C\x9D'}
+
+def is_open(tx):
+    """True if a serial stream writer is connected"""
+    return tx is not None and not tx.is_closing()
+
+# Port description / hardware ID fragments for each device kind (CH340 can be either)
+PORT_KINDS = (
+    ('grbl', ('ch340', 'stm', 'usb-serial'), ('0483',)),
+    # ESP32 typically uses CP2102, CH340, or FTDI
+    ('esp32', ('cp210', 'ch340', 'ftdi', 'usb serial'), ('10C4',)),
+)
+
+def _classify(port):
+    """Return the set of device kinds a port could be"""
+    desc = (port.description or '').lower()
+    hwid = (port.hwid or '').upper()
+    return {kind for kind, descs, hwids in PORT_KINDS
+            if any(d in desc for d in descs) or any(h in hwid for h in hwids)}
 
 def find_grbl_port():
     """Find likely grblHAL port"""
-    for p in serial.tools.list_ports.comports():
-        desc = (p.description or '').lower()
-        hwid = (p.hwid or '').upper()
-        if any(x in desc for x in ['ch340', 'stm', 'usb-serial']) or '0483' in hwid:
+    ports = serial.tools.list_ports.comports()
+    for p in ports:
+        if 'grbl' in _classify(p):
             return p.device
-    ports = list(serial.tools.list_ports.comports())
     return ports[0].device if ports else None
 
 def find_esp32_ports():
     """Find ESP32 ports (CP2102, CH340, etc)"""
-    esp_ports = []
-    for p in serial.tools.list_ports.comports():
-        desc = (p.description or '').lower()
-        hwid = (p.hwid or '').upper()
-        # ESP32 typically uses CP2102, CH340, or FTDI
-        if any(x in desc for x in ['cp210', 'ch340', 'ftdi', 'usb serial']) or '10C4' in hwid:
-            esp_ports.append(p.device)
-    return esp_ports
+    return [p.device for p in serial.tools.list_ports.comports() if 'esp32' in _classify(p)]
+
+async def open_stream(port, baud):
+    """Open a serial port in a worker thread and wrap it in asyncio streams"""
+    loop = asyncio.get_running_loop()
+    # Opening can block for up to a second while a USB-serial driver settles
+    ser = await loop.run_in_executor(None, functools.partial(serial.serial_for_url, port, baudrate=baud))
+    reader = asyncio.StreamReader(limit=MAX_BUFFER_SIZE)
+    protocol = asyncio.StreamReaderProtocol(reader)
+    transport, _ = await serial_asyncio.connection_for_serial(loop, lambda: protocol, ser)
+    return reader, asyncio.StreamWriter(transport, protocol, reader, loop)
 
 async def init_serial(port, baud):
     """Initialize serial connection"""
-    global serial_port
+    global grbl_rx, grbl_tx, grbl_port
     try:
-        serial_port = serial.Serial(port, baud, timeout=0.1)
-        serial_port.dtr = True
+        grbl_rx, grbl_tx = await open_stream(port, baud)
+        grbl_tx.transport.serial.dtr = True
         await asyncio.sleep(1)
-        serial_port.reset_input_buffer()
-        serial_port.write(b'\x18')
+        grbl_tx.write(b'\x18')
         await asyncio.sleep(0.3)
-        serial_port.reset_input_buffer()
-        print(f"[OK] Connected to grblHAL on {port} @ {baud}")
+        grbl_port = port
+        log.info(f"[OK] Connected to grblHAL on {port} @ {baud}")
         return True
     except Exception as e:
-        print(f"[ERR] Serial error on {port}: {e}")
+        log.error(f"[ERR] Serial error on {port}: {e}")
         return False
 
 async def init_vfd(port, baud=115200):
     """Initialize ESP32 VFD controller connection"""
-    global vfd_port
+    global vfd_rx, vfd_tx
     try:
-        vfd_port = serial.Serial(port, baud, timeout=0.1)
+        vfd_rx, vfd_tx = await open_stream(port, baud)
         await asyncio.sleep(0.5)
-        vfd_port.reset_input_buffer()
         # Request initial status
-        vfd_port.write(b'STATUS\n')
-        print(f"[OK] Connected to ESP32 VFD on {port} @ {baud}")
+        vfd_tx.write(b'STATUS\n')
+        log.info(f"[OK] Connected to ESP32 VFD on {port} @ {baud}")
         return True
     except Exception as e:
-        print(f"[ERR] VFD serial error on {port}: {e}")
+        log.error(f"[ERR] VFD serial error on {port}: {e}")
         return False
 
 async def send_vfd_command(cmd):
     """Send command to ESP32 VFD controller"""
-    global vfd_port
-    if vfd_port and vfd_port.is_open:
+    if is_open(vfd_tx):
         async with vfd_lock:
             try:
-                vfd_port.write(f"{cmd.strip()}\n".encode('utf-8'))
+                vfd_tx.write(f"{cmd.strip()}\n".encode('utf-8'))
                 return True
             except Exception as e:
-                print(f"[ERR] VFD write error: {e}")
+                log.error(f"[ERR] VFD write error: {e}")
     return False
 
 async def broadcast(message):
-    """Send message to all WebSocket clients - THREAD-SAFE"""
+    """Queue message for all WebSocket clients - never waits on a socket"""
     if not connected_clients:
         return
-    # SAFETY FIX: Copy set to avoid "set changed size during iteration"
-    clients = connected_clients.copy()
-    dead = set()
-    for ws in clients:
+    # Encode once for every client rather than once per send
+    payload = message.encode('utf-8') if isinstance(message, str) else message
+    for outbox in connected_clients.values():
+        # SAFETY: A slow client loses its oldest backlog instead of growing RAM
+        if outbox.full():
+            outbox.get_nowait()
+        outbox.put_nowait(payload)
+
+async def client_writer(ws, outbox):
+    """Drain one client's outbox onto its socket"""
+    try:
+        while True:
+            # Coalesce lines queued behind this one into a single frame - serial
+            # output and JSON messages alike end in '\n'
+            lines = [await outbox.get()]
+            while not outbox.empty():
+                lines.append(outbox.get_nowait())
+            # A lagging client only needs the newest status report
+            statuses = [i for i, line in enumerate(lines) if line.startswith(b'<')]
+            for i in reversed(statuses[:-1]):
+                del lines[i]
+            message = b''.join(lines)
+            # Payloads are already UTF-8; send them as text frames without re-encoding
+            await ws.send_frame(message, aiohttp.WSMsgType.TEXT)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        # Stop queueing for it, and close it so the browser sees the drop and
+        # reconnects instead of sitting on a socket nothing is sent to
+        log.warning(f"[WARN] WebSocket send failed, closing client: {e}")
+        connected_clients.pop(ws, None)
+        await ws.close()
+
+def send_gcode(cmd):
+    """Write a G-code line to the port, in order with realtime bytes"""
+    if is_open(grbl_tx):
         try:
-            await ws.send_str(message)
-        except Exception:
-            dead.add(ws)
-    connected_clients.difference_update(dead)
-
-async def send_gcode(cmd):
-    """Send G-code command with mutex protection"""
-    global serial_port
-    if serial_port and serial_port.is_open:
-        # CRITICAL SAFETY: Use mutex to prevent command corruption
-        async with serial_lock:
-            try:
-                serial_port.write(f"{cmd.strip()}\n".encode('utf-8'))
-                return True
-            except Exception as e:
-                print(f"Serial write error: {e}")
+            grbl_tx.write(f"{cmd.strip()}\n".encode('utf-8'))
+        except Exception as e:
+            log.error(f"Serial write error: {e}")
+            return False
+        return True
     return False
 
 async def send_realtime(char):
-    """Send realtime character with mutex protection and validation"""
-    global serial_port
-    if not serial_port or not serial_port.is_open:
+    """Send realtime character with validation.
+
+    Written straight after any G-code the same client sent earlier, so a jog
+    cancel or feed hold can't overtake the moves it follows.
+    """
+    if not is_open(grbl_tx):
         return False
     
     # CRITICAL SAFETY: Whitelist realtime characters
-    if char not in ALLOWED_REALTIME:
-        print(f"[SECURITY] Blocked invalid realtime char: {repr(char)}")
+    data = ALLOWED_REALTIME.get(char)
+    if data is None:
+        log.warning(f"[SECURITY] Blocked invalid realtime char: {repr(char)}")
         return False
     
-    async with serial_lock:
-        try:
-            serial_port.write(char.encode('utf-8'))
-            return True
-        except Exception as e:
-            print(f"Serial realtime write error: {e}")
-            return False
-    return False
+    try:
+        grbl_tx.write(data)
+        return True
+    except Exception as e:
+        log.error(f"Serial realtime write error: {e}")
+        return False
 
 async def serial_reader():
     """Read serial and broadcast to clients - with reconnection support"""
-    global serial_port
-    buffer = ""
+    global grbl_rx, grbl_tx, last_status
     reconnect_attempts = 0
     max_reconnect_attempts = 10
     
     while True:
         try:
             # Check if serial is connected
-            if serial_port and serial_port.is_open:
+            if is_open(grbl_tx):
                 reconnect_attempts = 0  # Reset on successful read cycle
-                if serial_port.in_waiting:
-                    data = serial_port.read(serial_port.in_waiting).decode('utf-8', errors='replace')
-                    buffer += data
-                    
-                    # CRITICAL SAFETY: Prevent buffer overflow / memory exhaustion
-                    if len(buffer) > MAX_BUFFER_SIZE:
-                        print(f"[WARN] Buffer overflow - truncating {len(buffer)} bytes to {MAX_BUFFER_SIZE}")
-                        buffer = buffer[-MAX_BUFFER_SIZE:]
-                    
-                    while '\n' in buffer:
-                        line, buffer = buffer.split('\n', 1)
-                        line = line.strip()
-                        if line:
-                            await broadcast(line)
+                try:
+                    line = await grbl_rx.readuntil(b'\n')
+                except asyncio.IncompleteReadError:
+                    raise serial.SerialException("port closed")
+                except asyncio.LimitOverrunError as e:
+                    # CRITICAL SAFETY: Stream limit caps memory - discard the runaway line
+                    log.warning(f"[WARN] Buffer overflow - discarding {e.consumed} bytes")
+                    await grbl_rx.readexactly(e.consumed)
+                    continue
+                
+                line = line.strip().decode('utf-8', errors='replace')
+                if line:
+                    # Trailing newline lets client_writer batch lines into one frame
+                    payload = (line + '\n').encode('utf-8')
+                    if line.startswith('<'):
+                        last_status = payload
+                    await broadcast(payload)
             else:
                 # Serial disconnected - attempt reconnection
                 if reconnect_attempts < max_reconnect_attempts:
                     reconnect_attempts += 1
-                    print(f"[WARN] Serial disconnected, reconnection attempt {reconnect_attempts}/{max_reconnect_attempts}")
-                    await broadcast(json.dumps({"type": "bridge_status", "serial": "reconnecting"}))
+                    log.warning(f"[WARN] Serial disconnected, reconnection attempt {reconnect_attempts}/{max_reconnect_attempts}")
+                    await broadcast(BRIDGE_STATUS["reconnecting"])
                     
-                    port = find_grbl_port()
-                    if port:
-                        if await init_serial(port, 115200):
-                            print(f"[OK] Reconnected to {port}")
-                            await broadcast(json.dumps({"type": "bridge_status", "serial": "connected"}))
-                            continue
+                    # Retry the last good port before paying for a comports() scan
+                    reconnected = grbl_port and await init_serial(grbl_port, 115200)
+                    if not reconnected:
+                        port = find_grbl_port()
+                        reconnected = port and port != grbl_port and await init_serial(port, 115200)
+                    if reconnected:
+                        log.info(f"[OK] Reconnected to {grbl_port}")
+                        await broadcast(BRIDGE_STATUS["connected"])
+                        continue
                     
                     # Wait before next attempt with exponential backoff
                     await asyncio.sleep(min(2 ** reconnect_attempts, 30))
@@ -211,63 +298,78 @@ async def serial_reader():
                     # Max attempts reached, wait longer
                     await asyncio.sleep(10)
                     
-        except serial.SerialException as e:
-            print(f"[ERR] Serial error: {e}")
-            serial_port = None  # Trigger reconnection
-            await broadcast(json.dumps({"type": "bridge_status", "serial": "disconnected", "error": str(e)}))
+        except (serial.SerialException, OSError) as e:
+            log.error(f"[ERR] Serial error: {e}")
+            if grbl_tx:
+                grbl_tx.close()
+            grbl_rx = grbl_tx = None  # Trigger reconnection
+            last_status = None
+            await broadcast(json_line({"type": "bridge_status", "serial": "disconnected", "error": str(e)}))
         except Exception as e:
-            print(f"[ERR] Reader error: {e}")
-            
-        await asyncio.sleep(0.01)
+            log.error(f"[ERR] Reader error: {e}")
+            await asyncio.sleep(1)
 
 async def status_poll():
-    """Poll grblHAL status"""
+    """Poll grblHAL status at 4Hz while anyone is watching"""
     while True:
-        if connected_clients and serial_port and serial_port.is_open:
-            await send_gcode('?')
+        if not connected_clients:
+            await asyncio.sleep(1.0)
+            continue
+        if is_open(grbl_tx):
+            # Single realtime byte - no lock needed, see send_realtime()
+            try:
+                grbl_tx.write(STATUS_QUERY)
+            except Exception as e:
+                log.error(f"Serial status poll error: {e}")
         await asyncio.sleep(0.25)
 
 async def vfd_reader():
     """Read ESP32 VFD controller and update status"""
-    global vfd_port, vfd_status
-    buffer = ""
+    global vfd_status
     
     while True:
         try:
-            if vfd_port and vfd_port.is_open:
-                if vfd_port.in_waiting:
-                    data = vfd_port.read(vfd_port.in_waiting).decode('utf-8', errors='replace')
-                    buffer += data
-                    
-                    while '\n' in buffer:
-                        line, buffer = buffer.split('\n', 1)
-                        line = line.strip()
-                        if line.startswith('{'):
-                            try:
-                                msg = json.loads(line)
-                                # Update VFD status from ESP32
-                                if 'vfd' in msg:
-                                    vfd_status.update(msg['vfd'])
-                                    # Broadcast to clients
-                                    await broadcast(json.dumps({"type": "vfd_status", **msg['vfd']}))
-                                elif 'cmd' in msg:
-                                    # Command response
-                                    await broadcast(json.dumps({"type": "vfd_response", **msg}))
-                                elif 'error' in msg:
-                                    print(f"[VFD] Error: {msg['error']}")
-                            except json.JSONDecodeError:
-                                pass
-                        elif line and not line.startswith('[DEBUG]'):
-                            print(f"[VFD] {line}")
+            if is_open(vfd_tx):
+                try:
+                    line = await vfd_rx.readuntil(b'\n')
+                except asyncio.IncompleteReadError:
+                    # EOF - the ESP32 was unplugged
+                    log.warning("[WARN] VFD port closed")
+                    vfd_tx.close()
+                    continue
+                except asyncio.LimitOverrunError as e:
+                    await vfd_rx.readexactly(e.consumed)
+                    continue
+                
+                line = line.strip()
+                if line.startswith(b'{'):
+                    try:
+                        msg = json_loads(line)
+                        # Update VFD status from ESP32
+                        if 'vfd' in msg:
+                            vfd_status.update(msg['vfd'])
+                            # Broadcast to clients
+                            await broadcast(json_line({"type": "vfd_status", **msg['vfd']}))
+                        elif 'cmd' in msg:
+                            # Command response
+                            await broadcast(json_line({"type": "vfd_response", **msg}))
+                        elif 'error' in msg:
+                            log.warning(f"[VFD] Error: {msg['error']}")
+                    except json.JSONDecodeError:
+                        pass
+                elif line and not line.startswith(b'[DEBUG]'):
+                    log.info(f"[VFD] {line.decode('utf-8', errors='replace')}")
+            else:
+                # No VFD attached - readuntil() does the waiting once one is
+                await asyncio.sleep(1)
         except Exception as e:
-            print(f"[ERR] VFD reader error: {e}")
-            
-        await asyncio.sleep(0.01)
+            log.error(f"[ERR] VFD reader error: {e}")
+            await asyncio.sleep(1)
 
 async def vfd_poll():
     """Poll VFD status periodically"""
     while True:
-        if vfd_port and vfd_port.is_open:
+        if is_open(vfd_tx):
             await send_vfd_command('STATUS')
         await asyncio.sleep(0.5)  # 2Hz poll rate
 
@@ -275,22 +377,26 @@ async def websocket_handler(request):
     """Handle WebSocket connections"""
     # CRITICAL SAFETY: Limit max clients to prevent DoS
     if len(connected_clients) >= MAX_CLIENTS:
-        print(f"[SECURITY] Rejecting client - max {MAX_CLIENTS} reached")
+        log.warning(f"[SECURITY] Rejecting client - max {MAX_CLIENTS} reached")
         return web.Response(status=503, text="Server full - max connections reached")
     
-    ws = web.WebSocketResponse()
+    # Frames are short status lines on a LAN - per-client deflate costs more CPU than it saves
+    ws = web.WebSocketResponse(compress=False)
     await ws.prepare(request)
     
     client_ip = request.remote or "unknown"
-    print(f"[WS+] Client connected: {client_ip} ({len(connected_clients)+1}/{MAX_CLIENTS})")
-    connected_clients.add(ws)
+    log.info(f"[WS+] Client connected: {client_ip} ({len(connected_clients)+1}/{MAX_CLIENTS})")
+    outbox = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+    connected_clients[ws] = outbox
+    writer = asyncio.create_task(client_writer(ws, outbox))
     
     # Send status
     try:
-        status = "connected" if (serial_port and serial_port.is_open) else "disconnected"
-        await ws.send_str(json.dumps({"type": "bridge_status", "serial": status}))
-        if serial_port and serial_port.is_open:
-            await send_gcode('?')
+        status = "connected" if is_open(grbl_tx) else "disconnected"
+        outbox.put_nowait(BRIDGE_STATUS[status])
+        # Cached report instead of a fresh '?' - status_poll refreshes it within 250ms
+        if last_status and is_open(grbl_tx):
+            outbox.put_nowait(last_status)
     except:
         pass
     
@@ -300,9 +406,9 @@ async def websocket_handler(request):
                 message = msg.data
                 if message.startswith('{'):
                     try:
-                        cmd = json.loads(message)
+                        cmd = json_loads(message)
                         if cmd.get('type') == 'gcode':
-                            await send_gcode(cmd.get('command', ''))
+                            send_gcode(cmd.get('command', ''))
                         elif cmd.get('type') == 'realtime':
                             # CRITICAL SAFETY: Use validated realtime sender
                             char = cmd.get('char', '')
@@ -314,18 +420,23 @@ async def websocket_handler(request):
                             if vfd_cmd:
                                 await send_vfd_command(vfd_cmd)
                     except json.JSONDecodeError:
-                        print(f"[WARN] Invalid JSON from client: {message[:50]}")
+                        log.warning(f"[WARN] Invalid JSON from client: {message[:50]}")
                     except Exception as e:
-                        print(f"[ERR] Command processing error: {e}")
+                        log.error(f"[ERR] Command processing error: {e}")
                 else:
-                    await send_gcode(message)
+                    send_gcode(message)
+            elif msg.type == aiohttp.WSMsgType.BINARY:
+                # A 1-byte binary frame is a raw realtime command - same whitelist
+                if len(msg.data) == 1:
+                    await send_realtime(chr(msg.data[0]))
             elif msg.type == aiohttp.WSMsgType.ERROR:
                 break
     except Exception as e:
-        print(f"[ERR] WebSocket error: {e}")
+        log.error(f"[ERR] WebSocket error: {e}")
     finally:
-        connected_clients.discard(ws)
-        print(f"[WS-] Client disconnected: {client_ip}")
+        connected_clients.pop(ws, None)
+        writer.cancel()
+        log.info(f"[WS-] Client disconnected: {client_ip}")
     
     return ws
 
@@ -344,12 +455,23 @@ def main():
     parser.add_argument('--baud', type=int, default=115200, help='Baud rate')
     args = parser.parse_args()
     
+    # Log through a queue so console I/O happens on a listener thread, not the event loop
+    log_queue = queue.Queue()
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    listener.start()
+    
+    # Use uvloop where installed; web.run_app creates its loop from the same policy
+    if uvloop:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
     # Initialize serial before starting server
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     
     com_port = args.com or find_grbl_port() or 'COM5'
-    loop.run_until_complete(init_serial(com_port, args.baud))
     
     # Initialize VFD controller if specified or auto-detect
     vfd_com = args.vfd
@@ -360,18 +482,14 @@ def main():
             if p != com_port:
                 vfd_com = p
                 break
+    
+    # Bring both ports up together so their settle delays overlap
+    inits = [init_serial(com_port, args.baud)]
     if vfd_com:
-        loop.run_until_complete(init_vfd(vfd_com))
+        inits.append(init_vfd(vfd_com))
+    loop.run_until_complete(asyncio.gather(*inits))
     
-    # Get local IP
-    import socket
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        local_ip = s.getsockname()[0]
-        s.close()
-    except:
-        local_ip = "localhost"
+    local_ip = get_local_ip() or "localhost"
     
     print(f"\n{'='*50}")
     print(f"  FluidCNC Bridge Server")
@@ -404,9 +522,12 @@ def main():
     
     # Run server
     try:
-        web.run_app(app, host='0.0.0.0', port=args.port)
+        # Same loop the serial streams were opened on
+        web.run_app(app, host='0.0.0.0', port=args.port, loop=loop)
     except KeyboardInterrupt:
         print("\nServer stopped.")
+    finally:
+        listener.stop()
 
 if __name__ == '__main__':
     main()
@@ -1,39 +1,23 @@
-import serial
-import serial.tools.list_ports
-import time
+import grbl_io
+from grbl_io import open_port, soft_reset
 
-ports = list(serial.tools.list_ports.comports())
-port = ports[0].device if ports else None
-if not port:
-    print("No serial port found")
-    exit()
-
-print(f"Connecting to {port}...")
-ser = serial.Serial(port, 115200, timeout=1)
-time.sleep(0.5)
+ser = open_port()
 
 # Soft reset first
 print("Resetting controller...")
-ser.write(b'\x18')
-time.sleep(2)
-ser.reset_input_buffer()
-
-# Drain welcome message
-while ser.in_waiting:
-    ser.readline()
+soft_reset(ser)
 
-def send(cmd, wait=0.5):
+def send(cmd, wait=1):
     print(f">> {cmd}", end=" ")
-    ser.write((cmd + '\n').encode())
-    time.sleep(wait)
-    result = ""
-    while ser.in_waiting:
-        line = ser.readline().decode('utf-8', errors='ignore').strip()
-        if line:
-            result = line
+    reply = grbl_io.send(ser, cmd, wait)
+    result = reply[-1] if reply else ""
     print(f"[{result}]" if result else "")
     return "ok" in result.lower() or result.startswith('$')
 
+def move(cmd, wait):
+    send(cmd)
+    grbl_io.send(ser, 'G4 P0', wait)  # Dwell is only acked once the move has finished
+
 print()
 print("=== SETTING MAX CURRENT (2000mA) ===")
 send('$X')
@@ -46,16 +30,10 @@ send('$142=2000')
 # Verify
 print()
 print("Verifying settings...")
-ser.write(b'$140\n')
-time.sleep(0.3)
-ser.write(b'$141\n')
-time.sleep(0.3)
-ser.write(b'$142\n')
-time.sleep(0.5)
-while ser.in_waiting:
-    line = ser.readline().decode('utf-8', errors='ignore').strip()
-    if line and line.startswith('$14'):
-        print(f"  {line}")
+for cmd in ('$140', '$141', '$142'):
+    for line in grbl_io.send(ser, cmd):
+        if line.startswith('$14'):
+            print(f"  {line}")
 
 print()
 print("=== MOTOR TEST AT 2.0A ===")
@@ -64,18 +42,18 @@ send('G91')
 
 print()
 print("X axis - 200mm at 2000mm/min...")
-send('G1 X200 F2000', 8)
-send('G1 X-200 F2000', 8)
+move('G1 X200 F2000', 8)
+move('G1 X-200 F2000', 8)
 
 print()
 print("Y axis - 200mm at 2000mm/min...")  
-send('G1 Y200 F2000', 8)
-send('G1 Y-200 F2000', 8)
+move('G1 Y200 F2000', 8)
+move('G1 Y-200 F2000', 8)
 
 print()
 print("Z axis - 200mm at 1000mm/min...")
-send('G1 Z200 F1000', 15)
-send('G1 Z-200 F1000', 15)
+move('G1 Z200 F1000', 15)
+move('G1 Z-200 F1000', 15)
 
 ser.close()
 print()
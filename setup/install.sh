@@ -234,8 +234,11 @@ setup_python_env() {
     pip install --quiet --upgrade pip
     pip install --quiet \
         pyserial \
-        websockets \
-        aiohttp \
+        pyserial-asyncio \
+        "websockets>=14" \
+        "aiohttp>=3.11" \
+        uvloop \
+        orjson \
         flask \
         flask-cors \
         python-dotenv
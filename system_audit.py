@@ -67,12 +67,12 @@ def main():
     }
 
     found_settings = {}
-    for line in data.split('\n'):
+    for line in data.splitlines():
         line = line.strip()
-        if line.startswith('$') and '=' in line:
-            key = line.split('=')[0]
-            val = line.split('=')[1]
-            found_settings[key] = val
+        if line.startswith('$'):
+            key, sep, val = line.partition('=')
+            if sep:
+                found_settings[key] = val
 
     # Print limit/homing settings
     for key, desc in settings_map.items():
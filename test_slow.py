@@ -1,61 +1,44 @@
-import serial
-import serial.tools.list_ports
-import time
+import sys
+from grbl_io import move, open_port, send
 
-ports = list(serial.tools.list_ports.comports())
-port = ports[0].device if ports else None
-if not port:
-    print("No serial port found")
-    exit()
-
-print(f"Connecting to {port}...")
-ser = serial.Serial(port, 115200, timeout=1)
-time.sleep(2)
+ser = open_port(reset='--reset' in sys.argv)
 ser.reset_input_buffer()
 
-def send(cmd, wait=0.3):
-    ser.write((cmd + '\n').encode())
-    time.sleep(wait)
-    while ser.in_waiting:
-        line = ser.readline().decode('utf-8', errors='ignore').strip()
-        if line:
-            print(f"  {line}")
-
 print("=== SLOW MOTOR TEST ===")
 print("Testing at LOW speed and LOW acceleration")
 print()
 
-send('$X')  # Unlock
-send('G21')  # Metric
-send('G91')  # Relative
+send(ser, '$X', echo=True)  # Unlock
+send(ser, 'G21', echo=True)  # Metric
+send(ser, 'G91', echo=True)  # Relative
 
 # Lower acceleration temporarily
 print("Setting low acceleration (100 mm/s^2)...")
-send('$120=100')
-send('$121=100')
-send('$122=100')
+send(ser, '$120=100', echo=True)
+send(ser, '$121=100', echo=True)
+send(ser, '$122=100', echo=True)
 
 print()
 print("Testing X axis - 50mm at 500mm/min...")
-send('G1 X50 F500', 8)
-send('G1 X-50 F500', 8)
+move(ser, 'G1 X50 F500', 8, echo=True)
+move(ser, 'G1 X-50 F500', 8, echo=True)
 
 print()
 print("Testing Y axis - 50mm at 500mm/min...")
-send('G1 Y50 F500', 8)
-send('G1 Y-50 F500', 8)
+move(ser, 'G1 Y50 F500', 8, echo=True)
+move(ser, 'G1 Y-50 F500', 8, echo=True)
 
 print()
 print("Testing Z axis - 50mm at 300mm/min...")
-send('G1 Z50 F300', 12)
-send('G1 Z-50 F300', 12)
+move(ser, 'G1 Z50 F300', 12, echo=True)
+move(ser, 'G1 Z-50 F300', 12, echo=True)
 
 # Restore acceleration
 print()
 print("Restoring acceleration (500 mm/s^2)...")
-send('$120=500')
-send('$121=500')
-send('$122=400')
+send(ser, '$120=500', echo=True)
+send(ser, '$121=500', echo=True)
+send(ser, '$122=400', echo=True)
 
 ser.close()
 print()
@@ -40,26 +40,25 @@ def send_and_wait(ser, cmd, timeout=30):
     print(f">> {cmd.strip()}", end=' ')
     
     start = time.time()
-    response = ''
     while time.time() - start < timeout:
-        if ser.in_waiting:
-            line = ser.readline().decode('utf-8', errors='ignore').strip()
-            if line:
-                if line == 'ok':
-                    print(f"[OK]")
-                    return True
-                elif line.startswith('error'):
-                    print(f"[{line}]")
-                    return False
-                elif line.startswith('<'):
-                    # Status report - extract position
-                    pass
-                elif line.startswith('ALARM'):
-                    print(f"\n⚠️  {line}")
-                    return False
-                else:
-                    print(f"  <- {line}")
-        time.sleep(0.01)
+        # Blocks for up to ser.timeout instead of busy-polling in_waiting
+        line = ser.read_until(b'\n').strip()
+        # Match on raw bytes; only lines that get printed are decoded
+        if line:
+            if line == b'ok':
+                print(f"[OK]")
+                return True
+            elif line.startswith(b'error'):
+                print(f"[{line.decode('utf-8', errors='ignore')}]")
+                return False
+            elif line.startswith(b'<'):
+                # Status report - extract position
+                pass
+            elif line.startswith(b'ALARM'):
+                print(f"\n⚠️  {line.decode('utf-8', errors='ignore')}")
+                return False
+            else:
+                print(f"  <- {line.decode('utf-8', errors='ignore')}")
     
     print("[TIMEOUT]")
     return False
@@ -92,8 +91,9 @@ def run_test():
     
     # Drain any startup messages
     time.sleep(1)
-    while ser.in_waiting:
-        line = ser.readline().decode('utf-8', errors='ignore').strip()
+    startup = b''.join(iter(lambda: ser.read_until(b'\n'), b''))
+    for line in startup.decode('utf-8', errors='ignore').splitlines():
+        line = line.strip()
         if line:
             print(f"  <- {line}")
     
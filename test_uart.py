@@ -1,90 +1,165 @@
-import serial
+import asyncio
+import re
 import serial.tools.list_ports
-import time
-
-# Find the Octopus Pro (usually CP210x or STM)
-ports = list(serial.tools.list_ports.comports())
-port = None
-for p in ports:
-    if 'cp210' in p.description.lower() or 'stm' in p.description.lower() or 'ch340' in p.description.lower():
-        port = p.device
-        break
-if not port and ports:
-    port = ports[0].device
-
-print(f"Connecting to {port}...")
-ser = serial.Serial(port, 115200, timeout=1)
-time.sleep(2)
-ser.reset_input_buffer()
-
-print("=== STARTUP MESSAGES ===")
-while ser.in_waiting:
-    print(ser.readline().decode('utf-8', errors='ignore').strip())
-
-def send(cmd, wait=0.5):
-    print(f"\n>> {cmd}")
-    ser.write((cmd + '\n').encode())
-    time.sleep(wait)
-    while ser.in_waiting:
-        line = ser.readline().decode('utf-8', errors='ignore').strip()
+from grbl_io import DAEMON_PORT
+
+# Both wake on the port's fd via loop.add_reader() on POSIX rather than polling
+# in_waiting; the fast fork also writes straight to the fd when it can
+try:
+    import serial_asyncio_fast as serial_asyncio
+except ImportError:
+    import serial_asyncio
+
+def find_port():
+    """Find the Octopus Pro (usually CP210x or STM)"""
+    ports = list(serial.tools.list_ports.comports())
+    for p in ports:
+        if 'cp210' in p.description.lower() or 'stm' in p.description.lower() or 'ch340' in p.description.lower():
+            return p.device
+    return ports[0].device if ports else None
+
+async def connect():
+    """Reuse fluidcnc_daemon's open port when it's running, else open the port here.
+
+    Through the daemon the controller stays connected between runs, so
+    there's no port scan and no reopen. Returns (reader, writer, reset):
+    reset is True when opening the port here rebooted the controller.
+    """
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', DAEMON_PORT)
+        print(f"Connected through fluidcnc_daemon on port {DAEMON_PORT}")
+        return reader, writer, False
+    except OSError:
+        pass
+    port = find_port()
+    print(f"Connecting to {port}...")
+    reader, writer = await serial_asyncio.open_serial_connection(url=port, baudrate=115200)
+    return reader, writer, True
+
+# A complete 'ok' or 'error:N' line ends a reply
+REPLY_END = re.compile(rb'^(?:ok|error).*\n', re.MULTILINE)
+
+async def drain_until_quiet(reader, quiet=0.15, max_total=3.0, wait_first=False):
+    """Print boot output until no new line arrives for `quiet` seconds.
+
+    With wait_first the quiet timer only starts at the first line: opening a
+    CP210x/CH340 port resets the controller, and its banner can take a
+    second or more.
+    """
+    loop = asyncio.get_running_loop()
+    end = loop.time() + max_total
+    started = not wait_first
+    while (remaining := end - loop.time()) > 0:
+        try:
+            line = await asyncio.wait_for(reader.readline(),
+                                          timeout=min(quiet, remaining) if started else remaining)
+        except asyncio.TimeoutError:
+            return
+        if not line:  # EOF
+            return
+        started = True
+        line = line.decode('utf-8', errors='ignore').strip()
         if line:
+            print(line)
+
+async def main():
+    reader, writer, reset = await connect()
+    loop = asyncio.get_running_loop()
+    
+    # The banner is done well inside 200ms once it starts - stop at the first
+    # quiet gap rather than sleeping a fixed 2s
+    print("=== STARTUP MESSAGES ===")
+    await drain_until_quiet(reader, wait_first=reset)
+    
+    async def request(cmd, max_wait=2.0):
+        """Send a command and return its reply lines as soon as ok/error arrives.
+
+        max_wait only bounds commands that never answer - it costs nothing otherwise.
+        """
+        writer.write((cmd + '\n').encode())
+        await writer.drain()
+        # Take whatever has arrived in one read per wakeup, split into lines once at the end
+        deadline = loop.time() + max_wait
+        buf = bytearray()
+        while not REPLY_END.search(buf):
+            try:
+                chunk = await asyncio.wait_for(reader.read(4096), timeout=deadline - loop.time())
+            except asyncio.TimeoutError:
+                break
+            if not chunk:  # EOF - the port or daemon went away
+                break
+            buf += chunk
+        lines = (line.decode('utf-8', errors='ignore').strip() for line in buf.split(b'\n'))
+        return [line for line in lines if line]
+    
+    async def send(cmd, max_wait=2.0):
+        """Send a command and print its reply"""
+        print(f"\n>> {cmd}")
+        for line in await request(cmd, max_wait):
             print(f"   {line}")
+    
+    async def read_settings():
+        """Fetch every setting with one $$ instead of a round-trip per setting"""
+        print("\n>> $$")
+        settings = {}
+        for line in await request('$$'):
+            key, sep, value = line.partition('=')
+            if sep and key[1:].isdigit():
+                settings[int(key[1:])] = value
+        return settings
+    
+    def show(settings, *keys):
+        for key in keys:
+            print(f"   ${key}={settings.get(key, '?')}")
+    
+    # Unlock and get info
+    await send('$X')
+    await send('$I')
+
+    print("\n" + "="*60)
+    print("=== TMC2209 UART TEST ===")
+    print("="*60)
+
+    # Test motor current settings
+    print("\n--- Motor Current Settings ---")
+    settings = await read_settings()
+    show(settings, 140, 141, 142)
+
+    # Test changing current (should work now!) - writes stay one per command
+    print("\n--- Testing Current Change ---")
+    await send('$140=2000')
+    await send('$141=2000')  
+    await send('$142=2000')
+
+    # Verify change; the rest of the report comes from the same dump
+    print("\n--- Verifying New Values ---")
+    settings = await read_settings()
+    show(settings, 140, 141, 142)
+
+    # Check microsteps
+    print("\n--- Microstep Settings ---")
+    show(settings, 150, 151, 152)
+
+    # Check hybrid threshold
+    print("\n--- Hybrid Threshold (StealthChop/SpreadCycle) ---")
+    show(settings, 160, 161, 162)
+
+    # Check StallGuard settings
+    print("\n--- StallGuard/Sensorless Settings ---")
+    show(settings, 200, 338, 339)
+
+    # Check hold current
+    print("\n--- Hold Current % ---")
+    show(settings, 210, 211, 212)
+
+    # Try M122 for driver debug
+    print("\n--- Driver Debug (M122) ---")
+    await send('M122')
+
+    writer.close()
+    print("\n" + "="*60)
+    print("=== TEST COMPLETE ===")
+    print("="*60)
 
-# Unlock and get info
-send('$X')
-send('$I')
-
-print("\n" + "="*60)
-print("=== TMC2209 UART TEST ===")
-print("="*60)
-
-# Test motor current settings
-print("\n--- Motor Current Settings ---")
-send('$140')
-send('$141')
-send('$142')
-
-# Test changing current (should work now!)
-print("\n--- Testing Current Change ---")
-send('$140=2000')
-send('$141=2000')  
-send('$142=2000')
-
-# Verify change
-print("\n--- Verifying New Values ---")
-send('$140')
-send('$141')
-send('$142')
-
-# Check microsteps
-print("\n--- Microstep Settings ---")
-send('$150')
-send('$151')
-send('$152')
-
-# Check hybrid threshold
-print("\n--- Hybrid Threshold (StealthChop/SpreadCycle) ---")
-send('$160')
-send('$161')
-send('$162')
-
-# Check StallGuard settings
-print("\n--- StallGuard/Sensorless Settings ---")
-send('$200')
-send('$338')
-send('$339')
-
-# Check hold current
-print("\n--- Hold Current % ---")
-send('$210')
-send('$211')
-send('$212')
-
-# Try M122 for driver debug
-print("\n--- Driver Debug (M122) ---")
-send('M122', 1.0)
-
-ser.close()
-print("\n" + "="*60)
-print("=== TEST COMPLETE ===")
-print("="*60)
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -12,13 +12,26 @@ Tests EVERYTHING and fixes issues automatically:
 - G-code parsing
 """
 import asyncio
+import contextvars
+import functools
 import json
 import os
 import re
+import shutil
 import sys
 import subprocess
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import orjson
+    def json_dumps(obj):
+        return orjson.dumps(obj).decode('utf-8')
+except ImportError:
+    def json_dumps(obj):
+        return json.dumps(obj, separators=(',', ':'))
+
 # Colors for Windows
 class C:
     OK = '\033[92m'
@@ -32,60 +45,143 @@ FLUIDCNC_DIR = Path(__file__).parent.parent
 ISSUES_FOUND = []
 FIXES_APPLIED = []
 
+# Patterns used by the checks, compiled once
+RE_ANIMATE = re.compile(rb'animate\s*\(\s*\)\s*\{')
+RE_BRACE = re.compile(rb'[{}]')
+RE_CLICK_HANDLER = re.compile(rb"\.addEventListener\(['\"]click['\"],\s*\(?(\w+)?\)?\s*=>")
+RE_BUTTON_REF = re.compile(rb"this\.elements\.(\w+)(?:Btn|\-btn)")
+RE_METHOD_CALL = re.compile(rb'this\.(\w+)\s*\?\.\s*(\w+)\s*\(|this\.(\w+)\.(\w+)\s*\(')
+RE_SCRIPT_SRC = re.compile(rb'<script[^>]*src=["\']([^"\']+)["\']')
+
+def find_balanced(src, pattern):
+    """Return the body of the first block opened by `pattern` (ending in '{'), or None.
+
+    Braces are matched by counting depth in one linear pass - a regex that
+    nests brace groups backtracks badly on unbalanced input.
+    """
+    start = pattern.search(src)
+    if not start:
+        return None
+    depth = 1
+    for brace in RE_BRACE.finditer(src, start.end()):
+        depth += 1 if brace.group() == b'{' else -1
+        if depth == 0:
+            return src[start.end():brace.start()]
+    return None
+
+@functools.lru_cache(maxsize=None)
+def load_bytes(path):
+    """Read a source file once per run - several checks share files.
+
+    The checks only look for ASCII patterns, so they work on the raw bytes;
+    text is decoded only where a match is printed.
+    """
+    return Path(path).read_bytes()
+
+# Whole-file scans stream in chunks of this size so memory stays flat
+CHUNK_SIZE = 65536
+
+def iter_chunks(path):
+    with open(path, 'rb') as f:
+        yield from iter(functools.partial(f.read, CHUNK_SIZE), b'')
+
+@functools.lru_cache(maxsize=1)
+def _js_files(directory, mtime_ns):
+    return tuple(Path(directory).glob('*.js'))
+
+def list_js_files():
+    """The app's JS sources, rescanned only when the directory changes"""
+    return _js_files(str(FLUIDCNC_DIR), FLUIDCNC_DIR.stat().st_mtime_ns)
+
+# Set while the checks run concurrently: each one records into its own log,
+# replayed in order afterwards so the sections don't interleave
+_check_log = contextvars.ContextVar('check_log', default=None)
+
+def _record(target, item):
+    """Print a line (target None) or append to a results list, or defer it to the check's log"""
+    log = _check_log.get()
+    if log is not None:
+        log.append((target, item))
+    elif target is None:
+        print(item)
+    else:
+        target.append(item)
+
+def emit(text=''):
+    _record(None, text)
+
 def print_header(title):
-    print(f"\n{C.BOLD}{C.INFO}{'='*60}{C.END}")
-    print(f"{C.BOLD}{C.INFO}  {title}{C.END}")
-    print(f"{C.BOLD}{C.INFO}{'='*60}{C.END}")
+    emit(f"\n{C.BOLD}{C.INFO}{'='*60}{C.END}")
+    emit(f"{C.BOLD}{C.INFO}  {title}{C.END}")
+    emit(f"{C.BOLD}{C.INFO}{'='*60}{C.END}")
 
 def ok(msg):
-    print(f"{C.OK}[OK]{C.END} {msg}")
+    emit(f"{C.OK}[OK]{C.END} {msg}")
 
 def warn(msg):
-    print(f"{C.WARN}[WARN]{C.END} {msg}")
-    ISSUES_FOUND.append(('WARN', msg))
+    emit(f"{C.WARN}[WARN]{C.END} {msg}")
+    _record(ISSUES_FOUND, ('WARN', msg))
 
 def err(msg):
-    print(f"{C.ERR}[ERR]{C.END} {msg}")
-    ISSUES_FOUND.append(('ERR', msg))
+    emit(f"{C.ERR}[ERR]{C.END} {msg}")
+    _record(ISSUES_FOUND, ('ERR', msg))
 
 def fix(msg):
-    print(f"{C.OK}[FIX]{C.END} {msg}")
-    FIXES_APPLIED.append(msg)
+    emit(f"{C.OK}[FIX]{C.END} {msg}")
+    _record(FIXES_APPLIED, msg)
 
 # ============================================================
 # 1. JAVASCRIPT SYNTAX CHECK
 # ============================================================
+BRACKET_PAIRS = (('Brace', '{', '}'), ('Parenthesis', '(', ')'), ('Bracket', '[', ']'))
+# Delete table that leaves only the bracket characters, for one-pass counting
+NOT_BRACKETS = bytes(b for b in range(256) if b not in b'{}()[]')
+
+def _check_syntax(f):
+    """Return the bracket-balance issues for one JS file"""
+    # Use a simple bracket-balance check since node might not be available.
+    # Brackets are ASCII, so the raw bytes can be counted without decoding.
+    counts = Counter()
+    for chunk in iter_chunks(f):
+        counts.update(chunk.translate(None, NOT_BRACKETS))
+    
+    issues = []
+    for name, opener, closer in BRACKET_PAIRS:
+        opened, closed = counts[ord(opener)], counts[ord(closer)]
+        if opened != closed:
+            issues.append(f"{name} mismatch: {opened} '{opener}' vs {closed} '{closer}'")
+    
+    return issues
+
+NODE = shutil.which('node')
+
+def _node_check(f):
+    """Return the parse error V8 reports for one JS file, if any"""
+    try:
+        result = subprocess.run([NODE, '--check', str(f)], capture_output=True, text=True, timeout=30)
+    except subprocess.TimeoutExpired:
+        return ["node --check timed out"]
+    if result.returncode == 0:
+        return []
+    # stderr starts with "<path>:<line>" and names the error further down
+    lines = result.stderr.strip().splitlines()
+    where = lines[0].rsplit(':', 1)[-1] if lines else '?'
+    error = next((line for line in lines if 'Error' in line), lines[-1] if lines else 'parse failed')
+    return [f"{error.strip()} (line {where})"]
+
 def check_js_syntax():
     print_header("JavaScript Syntax Check")
-    js_files = list(FLUIDCNC_DIR.glob("*.js"))
-    print(f"Checking {len(js_files)} JavaScript files...")
+    js_files = list_js_files()
+    # A real parser when node is installed; the bracket count can't see strings or regexes
+    check = _node_check if NODE else _check_syntax
+    emit(f"Checking {len(js_files)} JavaScript files{' with node --check' if NODE else ''}...")
+    
+    # Files are independent - check them in parallel, report in order
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 8) as pool:
+        results = list(pool.map(check, js_files))
     
     errors = []
-    for f in js_files:
-        # Use a simple regex-based syntax check since node might not be available
-        content = f.read_text(encoding='utf-8', errors='replace')
-        
-        # Check for common syntax issues
-        issues = []
-        
-        # Unmatched braces
-        open_braces = content.count('{')
-        close_braces = content.count('}')
-        if open_braces != close_braces:
-            issues.append(f"Brace mismatch: {open_braces} '{{' vs {close_braces} '}}'")
-        
-        # Unmatched parentheses
-        open_parens = content.count('(')
-        close_parens = content.count(')')
-        if open_parens != close_parens:
-            issues.append(f"Parenthesis mismatch: {open_parens} '(' vs {close_parens} ')'")
-        
-        # Unmatched brackets
-        open_brackets = content.count('[')
-        close_brackets = content.count(']')
-        if open_brackets != close_brackets:
-            issues.append(f"Bracket mismatch: {open_brackets} '[' vs {close_brackets} ']'")
-        
+    for f, issues in zip(js_files, results):
         if issues:
             for issue in issues:
                 err(f"{f.name}: {issue}")
@@ -111,10 +207,10 @@ def check_undefined_references():
     
     # Patterns to look for missing guards
     guard_checks = [
-        ('this.enhancedConfig.', 'if (!this.enhancedConfig)', 'visualizer-enhanced.js'),
-        ('this.premiumEffects.', 'if (!this.premiumEffects)', 'visualizer-enhanced.js'),
-        ('this.grbl.', 'if (!this.grbl)', 'app.js'),
-        ('this.visualizer.', 'if (!this.visualizer)', 'app.js'),
+        (b'this.enhancedConfig.', b'if (!this.enhancedConfig)', 'visualizer-enhanced.js'),
+        (b'this.premiumEffects.', b'if (!this.premiumEffects)', 'visualizer-enhanced.js'),
+        (b'this.grbl.', b'if (!this.grbl)', 'app.js'),
+        (b'this.visualizer.', b'if (!this.visualizer)', 'app.js'),
     ]
     
     issues_fixed = 0
@@ -124,14 +220,20 @@ def check_undefined_references():
         if not filepath.exists():
             continue
             
-        content = filepath.read_text(encoding='utf-8', errors='replace')
+        content = load_bytes(filepath)
         
-        # Find methods that use the pattern
-        lines = content.split('\n')
-        for i, line in enumerate(lines):
-            if pattern in line and guard_needed not in content[:content.find(line)]:
+        # Find uses of the pattern on lines before the first guard, comparing
+        # offsets rather than re-slicing the file for every line
+        guard_end = content.find(guard_needed)
+        if guard_end != -1:
+            guard_end += len(guard_needed)
+        start = content.find(pattern)
+        while start != -1:
+            line_start = content.rfind(b'\n', 0, start) + 1
+            if guard_end == -1 or guard_end > line_start:
                 # Check if there's already a guard in the same function
                 pass  # More complex analysis would go here
+            start = content.find(pattern, start + len(pattern))
     
     ok("Reference check complete")
     return True
@@ -149,15 +251,14 @@ def check_visualizer_inheritance():
         warn("visualizer-enhanced.js not found")
         return False
     
-    content = enhanced_path.read_text(encoding='utf-8', errors='replace')
+    content = load_bytes(enhanced_path)
     
     # Check 1: Does animate() have guard for enhancedConfig?
-    if 'animate()' in content:
+    if b'animate()' in content:
         # Find the animate function
-        animate_match = re.search(r'animate\s*\(\s*\)\s*\{([^}]+(?:\{[^}]*\}[^}]*)*)\}', content, re.DOTALL)
-        if animate_match:
-            animate_body = animate_match.group(1)
-            if 'if (!this.enhancedConfig)' not in animate_body:
+        animate_body = find_balanced(content, RE_ANIMATE)
+        if animate_body is not None:
+            if b'if (!this.enhancedConfig)' not in animate_body:
                 err("animate() missing enhancedConfig guard - parent calls it before child sets it up")
                 
                 # Auto-fix: Add guard
@@ -172,16 +273,18 @@ def check_visualizer_inheritance():
             return;
         }'''
                 
-                if old_animate in content:
-                    content = content.replace(old_animate, new_animate)
-                    enhanced_path.write_text(content, encoding='utf-8')
+                # Re-read as text for the edit so line endings round-trip
+                text = enhanced_path.read_text(encoding='utf-8')
+                if old_animate in text:
+                    enhanced_path.write_text(text.replace(old_animate, new_animate), encoding='utf-8')
+                    load_bytes.cache_clear()
                     fix("Added enhancedConfig guard to animate()")
             else:
                 ok("animate() has enhancedConfig guard")
     
     # Check 2: Does it properly call super()?
-    if 'extends GCodeVisualizer3D' in content:
-        if 'super(options)' in content or 'super(options);' in content:
+    if b'extends GCodeVisualizer3D' in content:
+        if b'super(options)' in content or b'super(options);' in content:
             ok("Properly extends GCodeVisualizer3D with super()")
         else:
             err("Missing super() call in constructor")
@@ -199,26 +302,26 @@ def check_event_handlers():
         err("app.js not found")
         return False
     
-    content = app_path.read_text(encoding='utf-8', errors='replace')
+    content = load_bytes(app_path)
     
     # Find all click handlers
-    click_handlers = re.findall(r"\.addEventListener\(['\"]click['\"],\s*\(?(\w+)?\)?\s*=>", content)
+    click_handlers = RE_CLICK_HANDLER.findall(content)
     
     # Find all button references
-    button_refs = re.findall(r"this\.elements\.(\w+)(?:Btn|\-btn)", content)
+    button_refs = RE_BUTTON_REF.findall(content)
     
     # Check that button handlers use optional chaining or null checks
     dangerous_calls = []
     
     # Pattern: this.something() without checking if this.something exists
-    method_calls = re.findall(r'this\.(\w+)\s*\?\.\s*(\w+)\s*\(|this\.(\w+)\.(\w+)\s*\(', content)
+    method_calls = RE_METHOD_CALL.findall(content)
     
     for match in method_calls:
         if match[0]:  # Optional chaining used - good
             continue
         else:
             obj, method = match[2], match[3]
-            if obj in ['grbl', 'visualizer', 'probeWizard', 'atc', 'macros', 'ai']:
+            if obj in [b'grbl', b'visualizer', b'probeWizard', b'atc', b'macros', b'ai']:
                 # These should use optional chaining
                 pass  # Could flag these
     
@@ -228,6 +331,30 @@ def check_event_handlers():
 # ============================================================
 # 5. WEBSOCKET COMMUNICATION TEST
 # ============================================================
+# Realtime commands are single known chars - serialize them once. Payloads stay
+# str: the bridge only reads text frames, and websockets sends bytes as binary.
+REALTIME_PAYLOADS = {char: json_dumps({'type': 'realtime', 'char': char}) for char in '!~?'}
+
+def gcode_payload(cmd):
+    return json_dumps({'type': 'gcode', 'command': cmd})
+
+async def drain_until(ws, done, max_time=2.0):
+    """Collect reply lines until done(line) is true, under one overall deadline"""
+    loop = asyncio.get_running_loop()
+    end = loop.time() + max_time
+    lines = []
+    while (remaining := end - loop.time()) > 0:
+        try:
+            resp = await asyncio.wait_for(ws.recv(), timeout=remaining)
+        except asyncio.TimeoutError:
+            break
+        # The bridge may batch several lines into one frame
+        for line in resp.splitlines():
+            lines.append(line)
+            if done(line):
+                return lines
+    return lines
+
 async def test_websocket():
     print_header("WebSocket Communication Test")
     
@@ -238,44 +365,46 @@ async def test_websocket():
         return True
     
     try:
-        async with websockets.connect('ws://localhost:8080/ws', open_timeout=5) as ws:
+        # Commands are a few dozen bytes - deflate would only cost time
+        async with websockets.connect('ws://localhost:8080/ws', open_timeout=5, compression=None) as ws:
             ok("WebSocket connected")
             
             # Test 1: Initial message
             msg = await asyncio.wait_for(ws.recv(), timeout=2)
-            data = json.loads(msg)
+            # The status report may follow in the same frame
+            data = json.loads(msg.splitlines()[0])
             if data.get('type') == 'bridge_status':
                 ok(f"Bridge status received: serial={data.get('serial')}")
             else:
                 ok(f"Initial message: {msg[:50]}")
             
             # Test 2: Status query
-            await ws.send(json.dumps({'type': 'gcode', 'command': '?'}))
-            resp = await asyncio.wait_for(ws.recv(), timeout=2)
-            if '<' in resp and '>' in resp:
-                ok(f"Machine status: {resp[:60]}")
+            await ws.send(gcode_payload('?'))
+            lines = await drain_until(ws, lambda line: line.startswith('<'))
+            if lines and '<' in lines[-1] and '>' in lines[-1]:
+                ok(f"Machine status: {lines[-1][:60]}")
+            elif lines:
+                ok(f"Response: {lines[0][:60]}")
             else:
-                ok(f"Response: {resp[:60]}")
+                err("No response to status query")
             
             # Test 3: Realtime commands
-            await ws.send(json.dumps({'type': 'realtime', 'char': '?'}))
+            await ws.send(REALTIME_PAYLOADS['?'])
             ok("Realtime command sent")
             
             # Test 4: Settings query  
-            await ws.send(json.dumps({'type': 'gcode', 'command': '$$'}))
+            await ws.send(gcode_payload('$$'))
             ok("Settings query sent")
             
-            # Read responses
-            settings_count = 0
-            for _ in range(30):
-                try:
-                    resp = await asyncio.wait_for(ws.recv(), timeout=0.2)
-                    if resp.startswith('$'):
-                        settings_count += 1
-                except asyncio.TimeoutError:
-                    break
+            # Read responses until the 'ok' that follows the dump
+            settings = []
+            def settings_done(line):
+                if line.startswith('$'):
+                    settings.append(line)
+                return bool(settings) and line.startswith(('ok', 'error'))
+            await drain_until(ws, settings_done)
             
-            ok(f"Received {settings_count} settings")
+            ok(f"Received {len(settings)} settings")
             
             # Test 5: Simulate button presses
             commands = [
@@ -292,14 +421,14 @@ async def test_websocket():
                 ('Coolant Off', 'M9'),
             ]
             
-            print(f"\n{C.INFO}Simulating button presses:{C.END}")
+            # Sent back to back - the bridge queues them, no need to pace by hand
+            emit(f"\n{C.INFO}Simulating button presses:{C.END}")
             for name, cmd in commands:
-                if cmd in ['!', '~']:
-                    await ws.send(json.dumps({'type': 'realtime', 'char': cmd}))
+                if cmd in REALTIME_PAYLOADS:
+                    await ws.send(REALTIME_PAYLOADS[cmd])
                 else:
-                    await ws.send(json.dumps({'type': 'gcode', 'command': cmd}))
-                print(f"  [SIM] {name}: {cmd}")
-                await asyncio.sleep(0.1)
+                    await ws.send(gcode_payload(cmd))
+                emit(f"  [SIM] {name}: {cmd}")
             
             ok("All simulated commands sent successfully")
             
@@ -323,10 +452,10 @@ def check_html_scripts():
         err("index.html not found")
         return False
     
-    content = html_path.read_text(encoding='utf-8', errors='replace')
+    content = load_bytes(html_path)
     
     # Find all script tags
-    scripts = re.findall(r'<script[^>]*src=["\']([^"\']+)["\']', content)
+    scripts = RE_SCRIPT_SRC.findall(content)
     
     # Check order - base classes must come before derived
     required_order = [
@@ -340,7 +469,7 @@ def check_html_scripts():
     
     script_positions = {}
     for i, script in enumerate(scripts):
-        name = script.split('?')[0].split('/')[-1]
+        name = script.decode('utf-8', 'replace').split('?')[0].split('/')[-1]
         script_positions[name] = i
     
     # Check order
@@ -374,19 +503,20 @@ def check_grblhal_errors():
         err("grblhal.js not found")
         return False
     
-    content = grbl_path.read_text(encoding='utf-8', errors='replace')
+    content = load_bytes(grbl_path)
     
     # Check for proper error handling
     checks = [
-        ('try {', 'Has try blocks'),
-        ('catch', 'Has catch blocks'),
-        ('onerror', 'Has WebSocket error handler'),
-        ('onclose', 'Has WebSocket close handler'),
-        ('reconnect', 'Has reconnection logic'),
+        (b'try {', 'Has try blocks'),
+        (b'catch', 'Has catch blocks'),
+        (b'onerror', 'Has WebSocket error handler'),
+        (b'onclose', 'Has WebSocket close handler'),
+        (b'reconnect', 'Has reconnection logic'),
     ]
     
+    content = content.lower()
     for pattern, desc in checks:
-        if pattern in content.lower():
+        if pattern in content:
             ok(desc)
         else:
             warn(f"Missing: {desc}")
@@ -396,29 +526,56 @@ def check_grblhal_errors():
 # ============================================================
 # 8. CHECK FOR MEMORY LEAKS
 # ============================================================
+# setTimeout is omitted - it auto-clears
+LEAK_PATTERNS = [
+    (rb'setInterval\s*\(', b'clearInterval', 'setInterval without cleanup'),
+    (rb'addEventListener\s*\(', b'removeEventListener', 'addEventListener without removal'),
+    (rb'new\s+Worker\s*\(', b'terminate', 'Worker without termination'),
+]
+# All of them in one alternation so each file is scanned once: group 2i+1 is
+# pattern i, group 2i+2 its cleanup call
+_LEAK_RE = re.compile(b'|'.join(
+    b'(%s)|(%s)' % (pattern, re.escape(cleanup)) for pattern, cleanup, _ in LEAK_PATTERNS
+))
+
+# Longer than any match, short of pathological whitespace before a '('
+LEAK_OVERLAP = 64
+
+def _check_leaks(f):
+    """Return the leak warnings for one JS file"""
+    counts = [0] * (2 * len(LEAK_PATTERNS) + 1)
+    tail = b''
+    for chunk in iter_chunks(f):
+        buf = tail + chunk
+        # Matches starting in the last LEAK_OVERLAP bytes may run into the
+        # next chunk - leave them for the next pass, which sees the whole thing
+        safe = len(buf) - LEAK_OVERLAP
+        end = 0
+        for m in _LEAK_RE.finditer(buf):
+            if m.start() >= safe:
+                break
+            counts[m.lastindex] += 1
+            end = m.end()
+        tail = buf[max(end, safe):]
+    for m in _LEAK_RE.finditer(tail):
+        counts[m.lastindex] += 1
+    
+    warnings = []
+    for i, (_, cleanup, desc) in enumerate(LEAK_PATTERNS):
+        matches, cleanups = counts[2 * i + 1], counts[2 * i + 2]
+        if matches > cleanups + 2:  # Allow some margin
+            warnings.append(f"{f.name}: {matches} {desc.split()[0]} but only {cleanups} {cleanup.decode()}")
+    return warnings
+
 def check_memory_leaks():
     print_header("Checking for Potential Memory Leaks")
     
-    js_files = list(FLUIDCNC_DIR.glob("*.js"))
-    
-    leak_patterns = [
-        (r'setInterval\s*\(', 'clearInterval', 'setInterval without cleanup'),
-        (r'setTimeout\s*\(', None, None),  # setTimeout auto-clears
-        (r'addEventListener\s*\(', 'removeEventListener', 'addEventListener without removal'),
-        (r'new\s+Worker\s*\(', 'terminate', 'Worker without termination'),
-    ]
+    js_files = list_js_files()
     
-    issues = []
-    for f in js_files:
-        content = f.read_text(encoding='utf-8', errors='replace')
-        
-        for pattern, cleanup, desc in leak_patterns:
-            if cleanup is None:
-                continue
-            matches = re.findall(pattern, content)
-            cleanups = content.count(cleanup)
-            if len(matches) > cleanups + 2:  # Allow some margin
-                warn(f"{f.name}: {len(matches)} {desc.split()[0]} but only {cleanups} {cleanup}")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for warnings in pool.map(_check_leaks, js_files):
+            for msg in warnings:
+                warn(msg)
     
     ok("Memory leak check complete")
     return True
@@ -434,14 +591,15 @@ def test_gcode_parser():
         err("gcode-parser.js not found")
         return False
     
-    content = parser_path.read_text(encoding='utf-8', errors='replace')
+    content = load_bytes(parser_path)
     
     # Check for essential G-code handling
     gcodes = ['G0', 'G1', 'G2', 'G3', 'G17', 'G20', 'G21', 'G28', 'G90', 'G91']
     mcodes = ['M3', 'M4', 'M5', 'M7', 'M8', 'M9', 'M30']
     
+    lowered = content.lower()
     for code in gcodes:
-        if code in content or code.lower() in content.lower():
+        if code.encode() in content or code.lower().encode() in lowered:
             ok(f"Handles {code}")
         else:
             warn(f"May not handle {code}")
@@ -461,7 +619,7 @@ async def simulate_user_session():
         return True
     
     try:
-        async with websockets.connect('ws://localhost:8080/ws', open_timeout=5) as ws:
+        async with websockets.connect('ws://localhost:8080/ws', open_timeout=5, compression=None) as ws:
             # Consume initial message
             await asyncio.wait_for(ws.recv(), timeout=2)
             
@@ -513,32 +671,43 @@ async def simulate_user_session():
                 ("Final status check", "?"),
             ]
             
-            print(f"\n{C.INFO}Running simulated user session:{C.END}")
+            emit(f"\n{C.INFO}Running simulated user session:{C.END}")
             errors = 0
             
-            for step_name, cmd in session_steps:
-                try:
-                    if cmd in ['!', '~', '?']:
-                        await ws.send(json.dumps({'type': 'realtime', 'char': cmd}))
-                    else:
-                        await ws.send(json.dumps({'type': 'gcode', 'command': cmd}))
-                    
-                    # Small delay to let machine process
-                    await asyncio.sleep(0.1)
-                    
-                    # Try to get response
+            # Pipeline the session: send every step without waiting on replies,
+            # while a consumer reads responses until the bridge goes quiet
+            async def producer():
+                nonlocal errors
+                for step_name, cmd in session_steps:
                     try:
-                        resp = await asyncio.wait_for(ws.recv(), timeout=0.5)
-                        if 'error' in resp.lower() or 'alarm' in resp.lower():
-                            warn(f"{step_name}: {resp[:50]}")
+                        if cmd in REALTIME_PAYLOADS:
+                            await ws.send(REALTIME_PAYLOADS[cmd])
                         else:
-                            ok(f"{step_name}: {cmd}")
+                            await ws.send(gcode_payload(cmd))
+                        ok(f"{step_name}: {cmd}")
+                    except Exception as e:
+                        err(f"{step_name}: {e}")
+                        errors += 1
+            
+            async def consumer():
+                # The bridge streams status reports at 4Hz while a client is
+                # connected, so only other replies count as activity
+                loop = asyncio.get_running_loop()
+                quiet_at = loop.time() + 0.5
+                while (remaining := quiet_at - loop.time()) > 0:
+                    try:
+                        resp = await asyncio.wait_for(ws.recv(), timeout=remaining)
                     except asyncio.TimeoutError:
-                        ok(f"{step_name}: {cmd} (no response)")
-                        
-                except Exception as e:
-                    err(f"{step_name}: {e}")
-                    errors += 1
+                        return
+                    # The bridge may batch several lines into one frame
+                    for line in resp.splitlines():
+                        if line.startswith('<'):
+                            continue
+                        quiet_at = loop.time() + 0.5
+                        if 'error' in line.lower() or 'alarm' in line.lower():
+                            warn(f"Response: {line[:50]}")
+            
+            await asyncio.gather(producer(), consumer())
             
             if errors == 0:
                 ok("Full user session simulation PASSED")
@@ -556,6 +725,58 @@ async def simulate_user_session():
 # ============================================================
 # MAIN DIAGNOSTIC RUNNER
 # ============================================================
+def _logged(check):
+    """Run a file check on a worker thread, returning everything it reported"""
+    log = []
+    _check_log.set(log)
+    check()
+    return log
+
+async def _logged_async(*checks):
+    """Run WebSocket checks one after another, returning everything they reported"""
+    log = []
+    _check_log.set(log)
+    for check in checks:
+        await check()
+    return log
+
+async def run_checks():
+    """Run the independent checks concurrently, then report them in the usual order"""
+    file_checks = [
+        check_js_syntax,
+        check_undefined_references,
+        check_visualizer_inheritance,
+        check_event_handlers,
+        check_html_scripts,
+        check_grblhal_errors,
+        check_memory_leaks,
+        test_gcode_parser,
+    ]
+    # This one may rewrite visualizer-enhanced.js - let it finish before the
+    # others read the JS files, so none of them sees a half-written file
+    fixing = check_visualizer_inheritance
+    try:
+        fixed = await asyncio.to_thread(_logged, fixing)
+    except Exception as e:
+        fixed = e
+    readers = [check for check in file_checks if check is not fixing]
+    # Both WebSocket tests share one bridge, which echoes every reply to every
+    # client - run them back to back so neither sees the other's responses
+    logs = await asyncio.gather(
+        *(asyncio.to_thread(_logged, check) for check in readers),
+        _logged_async(test_websocket, simulate_user_session),
+        return_exceptions=True,
+    )
+    logs.insert(file_checks.index(fixing), fixed)
+    
+    names = [check.__name__ for check in file_checks] + ['test_websocket']
+    for name, log in zip(names, logs):
+        if isinstance(log, BaseException):
+            err(f"{name} crashed: {log!r}")
+            continue
+        for target, item in log:
+            _record(target, item)
+
 async def main():
     print(f"\n{C.BOLD}{C.INFO}")
     print("╔══════════════════════════════════════════════════════════╗")
@@ -566,16 +787,8 @@ async def main():
     print(f"{C.END}")
     
     # Run all checks
-    check_js_syntax()
-    check_undefined_references()
-    check_visualizer_inheritance()
-    check_event_handlers()
-    check_html_scripts()
-    check_grblhal_errors()
-    check_memory_leaks()
-    test_gcode_parser()
-    await test_websocket()
-    await simulate_user_session()
+    load_bytes.cache_clear()
+    await run_checks()
     
     # Summary
     print_header("DIAGNOSTIC SUMMARY")
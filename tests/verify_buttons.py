@@ -2,79 +2,248 @@
 """Live verification of all FluidCNC button commands via WebSocket"""
 
 import asyncio
+import sys
+import time
 import websockets
 import json
+from itertools import groupby
+from websockets.frames import Frame, Opcode
+from websockets.protocol import State
 
-async def simulate_user_actions():
-    print('=== SIMULATING USER BUTTON CLICKS ===')
-    print('')
+try:
+    # Times out the awaiting task itself - no wrapper task per recv like wait_for()
+    from asyncio import timeout
+except ImportError:
+    # Python < 3.11; installed alongside aiohttp there
+    from async_timeout import timeout
+
+try:
+    import uvloop  # libuv event loop - not available on Windows
+except ImportError:
+    uvloop = None
+
+try:
+    import orjson
+    json_dumps = orjson.dumps
+except ImportError:
+    def json_dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+# 'char' is the realtime byte - the same field grblhal.js sends
+TESTS = [
+    ('E-Stop', {'type':'realtime','char':chr(0x18)}),
+    ('Status Query', {'type':'gcode','command':'?'}),
+    ('Unlock', {'type':'gcode','command':'$X'}),
+    ('Home All', {'type':'gcode','command':'$H'}),
+    ('Jog X+', {'type':'gcode','command':'$J=G91 G21 X1 F1000'}),
+    ('Jog Y+', {'type':'gcode','command':'$J=G91 G21 Y1 F1000'}),
+    ('Jog Z+', {'type':'gcode','command':'$J=G91 G21 Z1 F1000'}),
+    ('Zero X', {'type':'gcode','command':'G10 L20 P1 X0'}),
+    ('Zero Y', {'type':'gcode','command':'G10 L20 P1 Y0'}),
+    ('Zero Z', {'type':'gcode','command':'G10 L20 P1 Z0'}),
+    ('Spindle CW', {'type':'gcode','command':'M3 S12000'}),
+    ('Spindle Off', {'type':'gcode','command':'M5'}),
+    ('Coolant Flood', {'type':'gcode','command':'M8'}),
+    ('Coolant Off', {'type':'gcode','command':'M9'}),
+    ('Vacuum On', {'type':'gcode','command':'M7'}),
+    ('Vacuum Off', {'type':'gcode','command':'M9'}),
+    ('Select G54', {'type':'gcode','command':'G54'}),
+    ('Select G55', {'type':'gcode','command':'G55'}),
+    ('Select G56', {'type':'gcode','command':'G56'}),
+    ('Feed Override 100%', {'type':'realtime','char':chr(0x90)}),
+    ('Rapid Override 100%', {'type':'realtime','char':chr(0x95)}),
+    ('Spindle Override 100%', {'type':'realtime','char':chr(0x99)}),
+    ('Go To Origin', {'type':'gcode','command':'G90 G0 X0 Y0'}),
+    ('Safe Z', {'type':'gcode','command':'G90 G0 Z50'}),
+    ('Check Settings', {'type':'gcode','command':'$$'}),
+    ('Cancel Jog', {'type':'realtime','char':chr(0x85)}),
+    ('Cycle Start', {'type':'realtime','char':'~'}),
+    ('Feed Hold', {'type':'realtime','char':'!'}),
+]
+
+def build_frames(tests):
+    """Build the frames the test sends, once at import.
+
+    Runs of G-code buttons share one text frame - the bridge queues a
+    multi-line command as consecutive lines. Realtime bytes act immediately,
+    so each goes out in its place as a 1-byte binary frame, which the bridge
+    takes as a raw realtime command - no JSON to build or parse.
+
+    Frames are masked only when serialized, so these are reused across runs.
+    """
+    frames = []
+    for kind, group in groupby(tests, key=lambda test: test[1]['type']):
+        if kind == 'gcode':
+            command = '\n'.join(cmd['command'] for _, cmd in group)
+            frames.append(Frame(Opcode.TEXT, json_dumps({'type': 'gcode', 'command': command})))
+        else:
+            frames.extend(Frame(Opcode.BINARY, cmd['char'].encode('latin-1')) for _, cmd in group)
+    return tuple(frames)
+
+FRAMES = build_frames(TESTS)
+# Each G-code line gets one ok/error back; realtime bytes get no reply
+GCODE_LINES = sum(cmd['type'] == 'gcode' for _, cmd in TESTS)
+N_TESTS = len(TESTS)
+# Report lines for a clean run, built once
+OK_LINES = tuple('  [OK] ' + name for name, _ in TESTS)
+
+async def collect_acks(ws, count, quiet=0.3, min_quiet=0.02):
+    """Count ok/error replies until `count` arrive or the bridge goes quiet.
+
+    Status reports stream in at 4Hz while a client is connected, so only
+    other lines count as activity. "Quiet" starts at `quiet` seconds and
+    shrinks to 8x the average gap between replies once they flow, never
+    below `min_quiet` - a healthy bridge isn't waited on for the full window.
+    """
+    quiet_ns = int(quiet * 1e9)
+    min_quiet_ns = int(min_quiet * 1e9)
+    acks = 0
+    last_reply = time.monotonic_ns()
+    gap = None  # moving average of ns between reply frames
     
-    tests = [
-        ('E-Stop', {'type':'realtime','command':chr(0x18)}),
-        ('Status Query', {'type':'gcode','command':'?'}),
-        ('Unlock', {'type':'gcode','command':'$X'}),
-        ('Home All', {'type':'gcode','command':'$H'}),
-        ('Jog X+', {'type':'gcode','command':'$J=G91 G21 X1 F1000'}),
-        ('Jog Y+', {'type':'gcode','command':'$J=G91 G21 Y1 F1000'}),
-        ('Jog Z+', {'type':'gcode','command':'$J=G91 G21 Z1 F1000'}),
-        ('Zero X', {'type':'gcode','command':'G10 L20 P1 X0'}),
-        ('Zero Y', {'type':'gcode','command':'G10 L20 P1 Y0'}),
-        ('Zero Z', {'type':'gcode','command':'G10 L20 P1 Z0'}),
-        ('Spindle CW', {'type':'gcode','command':'M3 S12000'}),
-        ('Spindle Off', {'type':'gcode','command':'M5'}),
-        ('Coolant Flood', {'type':'gcode','command':'M8'}),
-        ('Coolant Off', {'type':'gcode','command':'M9'}),
-        ('Vacuum On', {'type':'gcode','command':'M7'}),
-        ('Vacuum Off', {'type':'gcode','command':'M9'}),
-        ('Select G54', {'type':'gcode','command':'G54'}),
-        ('Select G55', {'type':'gcode','command':'G55'}),
-        ('Select G56', {'type':'gcode','command':'G56'}),
-        ('Feed Override 100%', {'type':'realtime','command':chr(0x90)}),
-        ('Rapid Override 100%', {'type':'realtime','command':chr(0x95)}),
-        ('Spindle Override 100%', {'type':'realtime','command':chr(0x99)}),
-        ('Go To Origin', {'type':'gcode','command':'G90 G0 X0 Y0'}),
-        ('Safe Z', {'type':'gcode','command':'G90 G0 Z50'}),
-        ('Check Settings', {'type':'gcode','command':'$$'}),
-        ('Cancel Jog', {'type':'realtime','command':chr(0x85)}),
-        ('Cycle Start', {'type':'realtime','command':'~'}),
-        ('Feed Hold', {'type':'realtime','command':'!'}),
-    ]
+    async def read():
+        nonlocal acks, last_reply, gap
+        # Buffered messages come straight off websockets' queue - no timer
+        # per message, the loop below checks in every min_quiet instead
+        while acks < count:
+            try:
+                # Only ASCII prefixes are checked - skip decoding to str
+                resp = await ws.recv(decode=False)
+            except websockets.ConnectionClosedOK:
+                return
+            # The bridge may batch several lines into one frame
+            replied = False
+            for line in resp.splitlines():
+                if line.startswith(b'<'):
+                    continue
+                replied = True
+                if line.startswith((b'ok', b'error')):
+                    acks += 1
+            if replied:
+                now = time.monotonic_ns()
+                gap = now - last_reply if gap is None else (3 * gap + now - last_reply) // 4
+                last_reply = now
+    
+    reader = asyncio.ensure_future(read())
+    while not reader.done():
+        window = quiet_ns if gap is None else max(min_quiet_ns, min(quiet_ns, 8 * gap))
+        remaining = last_reply + window - time.monotonic_ns()
+        if remaining <= 0:
+            reader.cancel()
+            break
+        # The window shrinks as replies come in, so re-check it at least
+        # every min_quiet rather than sleeping out the old one
+        await asyncio.wait([reader], timeout=min(remaining, min_quiet_ns) / 1e9)
+    try:
+        await reader
+    except asyncio.CancelledError:
+        pass
+    return acks
+
+async def open_bridge(host='localhost'):
+    """Connect to the bridge on `host` and swallow its greeting"""
+    # Room for a whole burst of replies: a full receive queue pauses reading
+    # and backs the bridge up. No write_limit - the burst goes straight to the
+    # transport, past send()'s flow control. The bridge doesn't compress, and
+    # the hand-built frames assume no extensions, so don't offer it.
+    ws = await websockets.connect(f'ws://{host}:8080/ws', open_timeout=5,
+                                  max_queue=256, compression=None)
+    # Drain initial bridge status message
+    async with timeout(2):
+        await ws.recv(decode=False)
+    return ws
+
+_conns = {}
+
+async def get_conn(host='localhost'):
+    """One connection per host kept open for every run in this process.
+
+    Repeated runs (retries, an importing harness) skip the handshake;
+    it's reopened only if the bridge dropped it.
+    """
+    ws = _conns.get(host)
+    if ws is None or ws.state is not State.OPEN:
+        ws = _conns[host] = await open_bridge(host)
+    return ws
+
+async def close_conns():
+    """Close every cached connection"""
+    await asyncio.gather(*(ws.close() for ws in _conns.values()))
+    _conns.clear()
+
+async def simulate_user_actions(ws=None, host='localhost'):
+    """Press every button over `ws`, or over the cached connection to `host`"""
+    # Collected and written once at the end rather than a write per line -
+    # also keeps reports from parallel runs apart
+    report = [f'=== SIMULATING USER BUTTON CLICKS ({host}) ===', '']
     
     passed = 0
     failed = 0
     
     try:
-        async with websockets.connect('ws://localhost:8080/ws', open_timeout=5) as ws:
-            # Drain initial bridge status message
-            await asyncio.wait_for(ws.recv(), timeout=2)
-            
-            for name, cmd in tests:
-                try:
-                    await ws.send(json.dumps(cmd))
-                    try:
-                        resp = await asyncio.wait_for(ws.recv(), timeout=0.3)
-                        print(f'  [OK] {name}')
-                    except asyncio.TimeoutError:
-                        # Some realtime commands don't get responses
-                        print(f'  [OK] {name} (sent)')
-                    passed += 1
-                except Exception as e:
-                    print(f'  [ERR] {name}: {e}')
-                    failed += 1
-                    
+        # Passed in or cached, the connection outlives this run
+        if ws is None:
+            ws = await get_conn(host)
+        
+        # Pipelined: every frame goes out without waiting on replies,
+        # while the acks are counted as they come back. Realtime bytes
+        # never get one, so they pass once sent and aren't waited on.
+        async def producer():
+            nonlocal passed, failed
+            try:
+                if ws.state is not State.OPEN:
+                    raise ConnectionError('connection is not open')
+                # Serialized here and handed to the transport in one
+                # write, bypassing send(). Serialized per run so each
+                # frame still gets its own random mask.
+                # The whole burst is a single send() on the socket, so
+                # the kernel already packs it as tightly as TCP_CORK would.
+                ws.transport.write(b''.join(
+                    frame.serialize(mask=True) for frame in FRAMES))
+            except Exception as e:
+                report.extend(f'  [ERR] {name}: {e}' for name, _ in TESTS)
+                failed = N_TESTS
+                return
+            report.extend(OK_LINES)
+            passed = N_TESTS
+        
+        _, acked = await asyncio.gather(producer(), collect_acks(ws, GCODE_LINES))
+        if acked < GCODE_LINES:
+            # Some commands (e.g. $H into an alarm) don't get an ok
+            report.append(f'       ({GCODE_LINES - acked} of {GCODE_LINES} G-code lines got no reply)')
+                
     except Exception as e:
-        print(f'[ERR] Connection failed: {e}')
-        failed = len(tests)
+        report.append(f'[ERR] Connection failed: {e}')
+        # The burst may already have counted as sent
+        passed = 0
+        failed = N_TESTS
     
-    print('')
-    print(f'=== RESULT: {passed}/{len(tests)} button simulations passed ===')
+    report.append('')
+    report.append(f'=== RESULT: {passed}/{N_TESTS} button simulations passed ===')
     if failed == 0:
-        print('[OK] ALL BUTTONS VERIFIED WORKING!')
+        report.append('[OK] ALL BUTTONS VERIFIED WORKING!')
     else:
-        print(f'[WARN] {failed} buttons had issues')
+        report.append(f'[WARN] {failed} buttons had issues')
     
+    print('\n'.join(report))
     return failed == 0
 
+async def verify_hosts(hosts):
+    """Run against every bridge at once - the handshakes and replies overlap"""
+    # One run per host - concurrent runs can't share a cached connection
+    hosts = list(dict.fromkeys(hosts))
+    try:
+        results = await asyncio.gather(*(simulate_user_actions(host=host) for host in hosts))
+    finally:
+        await close_conns()
+    if len(hosts) > 1:
+        print(f'\n=== {sum(results)}/{len(hosts)} bridges passed ===')
+    return all(results)
+
 if __name__ == '__main__':
-    success = asyncio.run(simulate_user_actions())
+    # Use uvloop where installed, same as the bridge
+    if uvloop:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    # Usage: verify_buttons.py [host ...]
+    success = asyncio.run(verify_hosts(sys.argv[1:] or ['localhost']))
     exit(0 if success else 1)